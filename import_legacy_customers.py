@@ -34,15 +34,25 @@ FECHA: 2026-01-31
 """
 
 import argparse
+import gzip
+import http.client
+import itertools
+import json
 import logging
 import os
+import queue
 import re
 import sys
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import unicodedata
+import zipfile
+from collections import deque
+from datetime import datetime
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
-import xmlrpc.client
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+from xml.etree import ElementTree
+import urllib.parse
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -56,6 +66,12 @@ ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "admin")
 # Número de hilos para importación paralela
 NUM_THREADS = int(os.getenv("NUM_THREADS", "10"))
 
+# Clientes por lote (una búsqueda de existentes + un create masivo por lote)
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "200"))
+
+# Entradas de log retenidas en memoria en ImportResult.log_entries
+LOG_ENTRIES_MAX = 10000
+
 # Mapeo de tipos de IVA del sistema legacy a Odoo Argentina
 # l10n_ar_afip_responsibility_type_id
 IVA_TYPE_MAP = {
@@ -83,11 +99,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+# Tabla de translate que elimina todo carácter Latin-1 que no sea 0-9
+_DIGITS_ONLY = str.maketrans("", "", "".join(
+    chr(c) for c in range(256) if not "0" <= chr(c) <= "9"
+))
+_NON_DIGIT = re.compile(r"[^0-9]")
+
+
+# Indicadores de persona jurídica en el nombre: una sola pasada por nombre
+_COMPANY_INDICATORS = re.compile("|".join(re.escape(ind) for ind in (
+    'S.A.', 'SA ', 'SRL', 'S.R.L.', 'SAS', 'S.A.S.',
+    'SOCIEDAD', 'EMPRESA', 'CIA', 'COMPAÑIA', 'LTDA',
+    'S.C.', 'S.H.', 'COOPERATIVA', 'FUNDACION',
+)))
+
+
+def _normalize_city(city: str) -> str:
+    """Normaliza una ciudad para el mapeo: sin tildes, mayúsculas, espacios simples"""
+    ascii_city = unicodedata.normalize("NFKD", city).encode("ascii", "ignore").decode("ascii")
+    return " ".join(ascii_city.upper().split())
+
+
+def _digits_only(value: str) -> str:
+    """Retorna solo los dígitos ASCII de value (equivale a quitar [^0-9])"""
+    # CUIT/DNI cargados sin guiones: nada que limpiar
+    if value.isascii() and value.isdigit():
+        return value
+    digits = value.translate(_DIGITS_ONLY)
+    if digits.isascii():
+        return digits
+    # Guiones/espacios Unicode fuera de Latin-1: caer al regex precompilado
+    return _NON_DIGIT.sub("", digits)
+
+
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+# __slots__ en vez de __dict__ por instancia (menos memoria con miles de
+# filas); dataclass(slots=True) existe desde Python 3.10
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LegacyCustomer:
     """Representa un cliente del sistema legacy"""
     row_number: int
@@ -101,33 +159,26 @@ class LegacyCustomer:
     iva_type: str = ""
     email: str = ""
     
+    # Identificación derivada del CUIT (se calcula una vez al construir)
+    vat_clean: str = field(default="", init=False)
+    is_cuit: bool = field(default=False, init=False)
+    is_dni: bool = field(default=False, init=False)
+    
     # Procesamiento
     is_valid: bool = True
     validation_errors: List[str] = field(default_factory=list)
     
-    @property
-    def vat_clean(self) -> str:
-        """Retorna el CUIT/DNI sin guiones, solo números"""
-        if not self.cuit:
-            return ""
-        # Limpiar el CUIT - solo números
-        cuit_clean = re.sub(r'[^0-9]', '', self.cuit)
-        if len(cuit_clean) >= 7:  # DNI mínimo 7 dígitos, CUIT 11
-            return cuit_clean
-        return ""
-    
-    @property
-    def is_cuit(self) -> bool:
-        """Determina si es CUIT (11 dígitos) o DNI (7-8 dígitos)"""
-        return len(self.vat_clean) == 11
-    
-    @property
-    def is_dni(self) -> bool:
-        """Determina si es DNI"""
-        return 7 <= len(self.vat_clean) <= 8
+    def __post_init__(self):
+        """Calcula CUIT/DNI sin guiones y su tipo (CUIT 11 dígitos, DNI 7-8)"""
+        cuit_clean = _digits_only(self.cuit) if self.cuit else ""
+        # DNI mínimo 7 dígitos, CUIT 11
+        self.vat_clean = cuit_clean if len(cuit_clean) >= 7 else ""
+        vat_len = len(self.vat_clean)
+        self.is_cuit = vat_len == 11
+        self.is_dni = 7 <= vat_len <= 8
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ImportResult:
     """Resultado de la importación"""
     dry_run: bool = True
@@ -139,140 +190,431 @@ class ImportResult:
     customers_skipped: int = 0
     errors: List[str] = field(default_factory=list)
     created_ids: List[int] = field(default_factory=list)
-    log_entries: List[str] = field(default_factory=list)
+    # Solo las últimas entradas: el log completo queda en la salida del logger
+    log_entries: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_ENTRIES_MAX))
+
+
+# =============================================================================
+# LECTOR XLSX (STREAMING)
+# =============================================================================
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_TAG_ROW = f"{_NS_MAIN}row"
+_TAG_CELL = f"{_NS_MAIN}c"
+_TAG_VALUE = f"{_NS_MAIN}v"
+_TAG_TEXT = f"{_NS_MAIN}t"
+_TAG_RUN = f"{_NS_MAIN}r"
+_TAG_INLINE = f"{_NS_MAIN}is"
+_TAG_SHARED_ITEM = f"{_NS_MAIN}si"
+_TAG_SHEET_DATA = f"{_NS_MAIN}sheetData"
+
+
+class XlsxStreamReader:
+    """
+    Lector mínimo de .xlsx que recorre la hoja en streaming.
+
+    Lee el XML de la hoja directamente desde el zip con iterparse y libera
+    cada <row> apenas se procesa, por lo que la memoria no crece con la
+    cantidad de filas. Los shared strings se cargan una sola vez en una lista.
+    Emite tuplas con la misma forma que openpyxl (values_only=True).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Itera las filas de la hoja activa (numeradas desde 1, sin huecos)"""
+        with zipfile.ZipFile(self.file_path) as zf:
+            shared = self._load_shared_strings(zf)
+            sheet_path = self._active_sheet_path(zf)
+
+            with zf.open(sheet_path) as fh:
+                yield from self._iter_sheet(fh, shared)
+
+    def _iter_sheet(self, fh, shared: List[str]) -> Iterator[tuple]:
+        """Recorre <sheetData> emitiendo una tupla por fila"""
+        expected_row = 1
+        sheet_data = None
+
+        for event, elem in ElementTree.iterparse(fh, events=("start", "end")):
+            if event == "start":
+                if sheet_data is None and elem.tag == _TAG_SHEET_DATA:
+                    sheet_data = elem
+                continue
+
+            if elem.tag != _TAG_ROW:
+                continue
+
+            row_number = int(elem.get("r", expected_row))
+            # Filas vacías omitidas en el XML
+            while expected_row < row_number:
+                yield ()
+                expected_row += 1
+
+            yield self._parse_row(elem, shared)
+            expected_row += 1
+
+            # Liberar la fila para mantener la memoria constante
+            elem.clear()
+            if sheet_data is not None:
+                sheet_data.remove(elem)
+
+    @staticmethod
+    def _parse_row(row_elem, shared: List[str]) -> tuple:
+        """Convierte un <row> en tupla de valores"""
+        values: List[Any] = []
+
+        for cell in row_elem.iter(_TAG_CELL):
+            ref = cell.get("r")
+            if ref:
+                col_idx = _column_index(ref)
+                if col_idx > len(values):
+                    values.extend([None] * (col_idx - len(values)))
+
+            cell_type = cell.get("t", "n")
+
+            if cell_type == "inlineStr":
+                inline = cell.find(_TAG_INLINE)
+                values.append(_rich_text(inline) if inline is not None else None)
+                continue
+
+            raw = cell.findtext(_TAG_VALUE)
+            if raw is None:
+                values.append(None)
+            elif cell_type == "s":
+                values.append(shared[int(raw)])
+            elif cell_type in ("str", "e"):
+                values.append(raw)
+            elif cell_type == "b":
+                values.append(raw == "1")
+            elif cell_type == "d":
+                values.append(_parse_iso_datetime(raw))
+            else:
+                values.append(_parse_number(raw))
+
+        return tuple(values)
+
+    @staticmethod
+    def _load_shared_strings(zf: zipfile.ZipFile) -> List[str]:
+        """Carga xl/sharedStrings.xml en una lista indexada"""
+        try:
+            fh = zf.open("xl/sharedStrings.xml")
+        except KeyError:
+            return []
+
+        shared: List[str] = []
+        with fh:
+            for _, elem in ElementTree.iterparse(fh, events=("end",)):
+                if elem.tag == _TAG_SHARED_ITEM:
+                    shared.append(_rich_text(elem))
+                    elem.clear()
+        return shared
+
+    @staticmethod
+    def _active_sheet_path(zf: zipfile.ZipFile) -> str:
+        """Resuelve la ruta del XML de la hoja activa (equivalente a wb.active)"""
+        default = "xl/worksheets/sheet1.xml"
+        try:
+            workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+            rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        except KeyError:
+            return default
+
+        sheets = workbook.findall(f"{_NS_MAIN}sheets/{_NS_MAIN}sheet")
+        if not sheets:
+            return default
+
+        rel_id = sheets[XlsxStreamReader._active_tab(workbook, len(sheets))].get(f"{_NS_REL}id")
+        for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+            if rel.get("Id") == rel_id:
+                target = rel.get("Target", "")
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return f"xl/{target}"
+
+        return default
+
+    @staticmethod
+    def _active_tab(workbook, num_sheets: int) -> int:
+        """Índice de la hoja activa según bookViews (0 si no está o es inválido)"""
+        view = workbook.find(f"{_NS_MAIN}bookViews/{_NS_MAIN}workbookView")
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        return active if active < num_sheets else 0
+
+    def active_sheet_index(self) -> int:
+        """Posición de la hoja activa dentro del libro"""
+        with zipfile.ZipFile(self.file_path) as zf:
+            try:
+                workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+            except KeyError:
+                return 0
+        num_sheets = len(workbook.findall(f"{_NS_MAIN}sheets/{_NS_MAIN}sheet"))
+        return self._active_tab(workbook, num_sheets)
+
+
+def _iter_excel_rows(file_path: str) -> Iterator[tuple]:
+    """
+    Itera las filas de la hoja activa.
+
+    Si python-calamine está instalado (pip install python-calamine) la hoja
+    se decodifica en código nativo; si no, se usa XlsxStreamReader. Calamine
+    devuelve "" en celdas vacías y float en toda celda numérica: ambos casos
+    ya los normaliza _cell_text.
+    """
+    reader = XlsxStreamReader(file_path)
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        yield from reader.iter_rows()
+        return
+
+    workbook = CalamineWorkbook.from_path(file_path)
+    sheet = workbook.get_sheet_by_index(reader.active_sheet_index())
+    # Sin recortar el área vacía: los números de fila deben coincidir con Excel
+    yield from sheet.to_python(skip_empty_area=False)
+
+
+def _column_index(cell_ref: str) -> int:
+    """Convierte la referencia de celda ('AB12') en índice de columna base 0"""
+    idx = 0
+    for ch in cell_ref:
+        if "A" <= ch <= "Z":
+            idx = idx * 26 + (ord(ch) - 64)
+        else:
+            break
+    return idx - 1
+
+
+def _rich_text(elem) -> str:
+    """Concatena el texto de un <si>/<is>, ignorando la fonética (rPh)"""
+    parts = []
+    for child in elem:
+        if child.tag == _TAG_TEXT:
+            parts.append(child.text or "")
+        elif child.tag == _TAG_RUN:
+            parts.append(child.findtext(_TAG_TEXT) or "")
+    return "".join(parts)
+
+
+def _parse_number(raw: str) -> Any:
+    """Valor de una celda numérica: int, float o, si no es un número, el texto tal cual"""
+    try:
+        if "." in raw or "E" in raw or "e" in raw:
+            return float(raw)
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def _parse_iso_datetime(raw: str) -> Any:
+    """Valor de una celda t="d" (fecha ISO 8601): datetime o, si no se puede leer, el texto"""
+    try:
+        return datetime.fromisoformat(raw[:-1] if raw.endswith("Z") else raw)
+    except ValueError:
+        return raw
+
+
+def _cell_text(value: Any, numeric: bool = False) -> str:
+    """
+    Convierte una celda en texto limpio.
+
+    Los identificadores (código, CP, CUIT, teléfono) suelen llegar como
+    float desde Excel: se normalizan a entero en lugar de recortar '.0'
+    del texto.
+    """
+    if not value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = value.strip() if isinstance(value, str) else str(value).strip()
+    if numeric and text.endswith('.0'):
+        return text[:-2]
+    return text
 
 
 # =============================================================================
 # PARSER DE EXCEL
 # =============================================================================
 
+# Encabezado → clave de col_map. Cada alternativa es un lookahead anclado al
+# inicio, así gana la primera clave que aparezca en la celda en este orden
+# (mismo orden de prioridad que la cadena de if/elif original).
+_HEADER_COLUMN = re.compile(
+    r"(?P<code>(?=.*(?:núm|num)))"
+    r"|(?P<name>(?=.*nombre))"
+    r"|(?P<street>(?=.*(?:domic|direc)))"
+    r"|(?P<city>(?=.*(?:local|ciudad)))"
+    r"|(?P<zip>(?=.*(?:cp|postal)))"
+    r"|(?P<phone>(?=.*tel))"
+    r"|(?P<cuit>(?=.*cuit))"
+    r"|(?P<iva>(?=.*iva))"
+    r"|(?P<email>(?=.*mail))",
+    re.DOTALL,
+)
+
+
 class LegacyCustomerParser:
     """Parser para Excel de clientes legacy"""
     
+    # Clave de col_map → (atributo de LegacyCustomer, es identificador numérico)
+    FIELD_COLUMNS = {
+        'name': ('name', False),
+        'street': ('street', False),
+        'city': ('city', False),
+        'zip': ('zip_code', True),
+        'phone': ('phone', True),
+        'cuit': ('cuit', True),
+        'iva': ('iva_type', False),
+        'email': ('email', False),
+    }
+    
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.customers: List[LegacyCustomer] = []
         
     def parse(self) -> List[LegacyCustomer]:
         """Parsea el Excel y retorna lista de clientes"""
-        logger.info(f"Parseando archivo: {self.file_path}")
-        
-        try:
-            import openpyxl
-        except ImportError:
-            raise ImportError("Instale openpyxl: pip install openpyxl")
+        self.customers = list(self.iter_customers())
+
+        valid = sum(1 for c in self.customers if c.is_valid)
+        invalid = len(self.customers) - valid
+        logger.info(f"Parseados {len(self.customers)} clientes: {valid} válidos, {invalid} inválidos")
         
-        wb = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
-        sheet = wb.active
+        return self.customers
+    
+    def iter_customers(self) -> Iterator[LegacyCustomer]:
+        """
+        Emite los clientes a medida que se leen las filas.
         
+        Permite pasar el generador directo a CustomerImporter.import_customers
+        para que la importación arranque mientras se sigue leyendo el Excel.
+        """
+        logger.info(f"Parseando archivo: {self.file_path}")
+
+        rows = _iter_excel_rows(self.file_path)
+
         # Buscar fila de encabezados (contiene "Número", "Nombre", etc.)
         header_row = None
         col_map = {}
-        
-        for idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=20, values_only=True), 1):
+
+        for idx, row in enumerate(rows, 1):
+            if idx > 20:
+                break
             row_text = " ".join(str(c).lower() if c else "" for c in row)
             if 'número' in row_text or 'numero' in row_text:
                 header_row = idx
                 # Mapear columnas
                 for col_idx, cell in enumerate(row):
                     if cell:
-                        cell_lower = str(cell).lower().strip()
-                        if 'núm' in cell_lower or 'num' in cell_lower:
-                            col_map['code'] = col_idx
-                        elif 'nombre' in cell_lower:
-                            col_map['name'] = col_idx
-                        elif 'domic' in cell_lower or 'direc' in cell_lower:
-                            col_map['street'] = col_idx
-                        elif 'local' in cell_lower or 'ciudad' in cell_lower:
-                            col_map['city'] = col_idx
-                        elif 'cp' in cell_lower or 'postal' in cell_lower:
-                            col_map['zip'] = col_idx
-                        elif 'tel' in cell_lower:
-                            col_map['phone'] = col_idx
-                        elif 'cuit' in cell_lower:
-                            col_map['cuit'] = col_idx
-                        elif 'iva' in cell_lower:
-                            col_map['iva'] = col_idx
-                        elif 'mail' in cell_lower or 'email' in cell_lower:
-                            col_map['email'] = col_idx
+                        match = _HEADER_COLUMN.match(str(cell).lower())
+                        if match:
+                            col_map[match.lastgroup] = col_idx
                 break
         
         if not header_row:
+            rows.close()
             raise ValueError("No se encontró fila de encabezados en el Excel")
         
         logger.info(f"Encabezados encontrados en fila {header_row}: {col_map}")
         
-        # Parsear datos
-        for idx, row in enumerate(sheet.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
-            customer = self._parse_row(row, idx, col_map)
+        # Parsear datos (continúa el mismo recorrido, sin releer la hoja)
+        code_idx = col_map.get('code', 0)
+        plan = self._field_plan(col_map)
+        for idx, row in enumerate(rows, header_row + 1):
+            customer = self._parse_row(row, idx, code_idx, plan)
             if customer:
-                self.customers.append(customer)
-        
-        wb.close()
-        
-        valid = len([c for c in self.customers if c.is_valid])
-        invalid = len([c for c in self.customers if not c.is_valid])
-        logger.info(f"Parseados {len(self.customers)} clientes: {valid} válidos, {invalid} inválidos")
-        
-        return self.customers
+                yield customer
     
-    def _parse_row(self, row: tuple, row_number: int, col_map: Dict[str, int]) -> Optional[LegacyCustomer]:
+    def _field_plan(self, col_map: Dict[str, int]) -> tuple:
+        """Traduce col_map a tuplas (índice, atributo, numérico)"""
+        return tuple(
+            (col_map[key], attr, numeric)
+            for key, (attr, numeric) in self.FIELD_COLUMNS.items()
+            if key in col_map
+        )
+    
+    def _parse_row(self, row: tuple, row_number: int, code_idx: int, plan: tuple) -> Optional[LegacyCustomer]:
         """Parsea una fila y retorna un cliente"""
         # Verificar si es fila de datos (tiene código numérico)
-        code_idx = col_map.get('code', 0)
         if code_idx >= len(row) or not row[code_idx]:
             return None
         
-        code_val = str(row[code_idx]).strip()
-        # Limpiar .0 de floats
-        code_val = code_val.replace('.0', '')
+        code_val = _cell_text(row[code_idx], numeric=True)
         
         if not code_val or not code_val.replace('.', '').isdigit():
             return None
         
-        customer = LegacyCustomer(row_number=row_number)
-        customer.code = code_val
-        
-        # Extraer campos
-        def get_val(key: str) -> str:
-            idx = col_map.get(key)
-            if idx is not None and idx < len(row) and row[idx]:
-                val = str(row[idx]).strip()
-                # Limpiar .0 de floats en campos numéricos
-                if key in ['zip'] and val.endswith('.0'):
-                    val = val[:-2]
-                return val
-            return ""
-        
-        customer.name = get_val('name')
-        customer.street = get_val('street')
-        customer.city = get_val('city')
-        customer.zip_code = get_val('zip')
-        customer.phone = get_val('phone')
-        customer.cuit = get_val('cuit')
-        customer.iva_type = get_val('iva')
-        customer.email = get_val('email')
+        # Extraer campos (índices resueltos una sola vez por archivo)
+        values = {'code': code_val}
+        row_len = len(row)
+        for idx, attr, numeric in plan:
+            if idx < row_len:
+                values[attr] = _cell_text(row[idx], numeric)
+        
+        customer = LegacyCustomer(row_number=row_number, **values)
+        
+        # Limpiar CUIT inválido (reusa los dígitos calculados en __post_init__)
+        if customer.cuit and len(customer.vat_clean) < 10:
+            customer.cuit = ""
+            customer.vat_clean = ""
+            customer.is_cuit = customer.is_dni = False
         
         # Validaciones
         if not customer.name:
             customer.is_valid = False
             customer.validation_errors.append("Sin nombre")
         
-        # Limpiar CUIT inválido
-        if customer.cuit:
-            cuit_clean = re.sub(r'[^0-9]', '', customer.cuit)
-            if len(cuit_clean) < 10:
-                customer.cuit = ""  # CUIT inválido, limpiar
-        
         return customer
 
 
 # =============================================================================
-# CLIENTE ODOO (XML-RPC)
+# CLIENTE ODOO (JSON-RPC)
 # =============================================================================
+# Misma implementación que en migrate_legacy_balances.py (cada script es un CLI
+# autónomo): las dos copias se mantienen idénticas, cambiar ambas a la vez.
+
+# Encoder compartido: sin espacios y con UTF-8 directo (sin escapes \uXXXX)
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+try:
+    # Opcional: orjson serializa y parsea bastante más rápido (pip install orjson)
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serializa a JSON compacto en UTF-8 (con orjson si está instalado)"""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return _JSON_ENCODER.encode(obj).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parsea una respuesta JSON (con orjson si está instalado)"""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
 
 class OdooClient:
-    """Cliente XML-RPC para Odoo"""
+    """
+    Cliente JSON-RPC para Odoo.
+    
+    Usa el endpoint /jsonrpc sobre una única conexión HTTP persistente
+    (keep-alive): no hay handshake TCP/TLS por llamada y el JSON se
+    serializa bastante más rápido que el XML de XML-RPC. Las respuestas
+    pueden llegar comprimidas con gzip; los requests van sin comprimir
+    porque Odoo no descomprime el cuerpo de las llamadas.
+    No es thread-safe: usar una instancia por hilo.
+    """
     
     def __init__(self, url: str, db: str, user: str, password: str):
         self.url = url.rstrip("/")
@@ -280,40 +622,156 @@ class OdooClient:
         self.user = user
         self.password = password
         
+        parts = urllib.parse.urlsplit(self.url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._endpoint = f"{parts.path}/jsonrpc"
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._request_id = 0
+        
         logger.info(f"Conectando a Odoo: {self.url}")
         
-        common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-        self.uid = common.authenticate(self.db, self.user, self.password, {})
+        self.uid = self._call("common", "authenticate", [self.db, self.user, self.password, {}])
         
         if not self.uid:
             raise RuntimeError(f"Error de autenticación en Odoo. Usuario: {self.user}")
         
-        self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
         logger.info(f"Conectado exitosamente. UID: {self.uid}")
     
+    def _call(self, service: str, method: str, args: List) -> Any:
+        """Ejecuta una llamada JSON-RPC y retorna el resultado"""
+        self._request_id += 1
+        payload = _json_dumps({
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": args},
+            "id": self._request_id,
+        })
+        
+        response = _json_loads(self._post(payload))
+        
+        error = response.get("error")
+        if error:
+            data = error.get("data") or {}
+            raise RuntimeError(data.get("message") or error.get("message") or str(error))
+        return response.get("result")
+    
+    def _post(self, payload: bytes) -> bytes:
+        """
+        Envía el POST reutilizando la conexión abierta.
+        
+        Ante cualquier error (timeout, SSL, lectura incompleta, gzip inválido)
+        la conexión se descarta: una a medio usar haría fallar todas las
+        llamadas siguientes de este cliente, que vuelve al pool.
+        
+        Solo se reintenta, una vez, sobre una conexión reutilizada que el
+        servidor ya había cerrado: si falla el envío, o si responde cerrando
+        sin mandar nada (RemoteDisconnected). En este segundo caso el request
+        ya se escribió; Odoo cierra las conexiones keep-alive ociosas sin
+        leerlo, pero si el servidor se cayó procesándolo un create podría
+        quedar repetido.
+        """
+        while True:
+            reused = self._conn is not None
+            if not reused:
+                conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+                self._conn = conn_cls(self._host, self._port)
+            
+            conn = self._conn
+            sent = False
+            try:
+                conn.request(
+                    "POST", self._endpoint, body=payload,
+                    headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+                )
+                sent = True
+                response = conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status} desde {self.url}{self._endpoint}")
+                if response.getheader("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+            except BaseException as e:
+                conn.close()
+                self._conn = None
+                if sent:
+                    stale = isinstance(e, http.client.RemoteDisconnected)
+                else:
+                    # RemoteDisconnected es un ConnectionResetError
+                    stale = isinstance(e, (ConnectionResetError, BrokenPipeError))
+                if reused and stale:
+                    continue
+                raise
+    
     def execute_kw(self, model: str, method: str, args: List, kwargs: Optional[Dict] = None):
+        """Ejecuta método en Odoo"""
         kwargs = kwargs or {}
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, args, kwargs
+        return self._call(
+            "object", "execute_kw",
+            [self.db, self.uid, self.password, model, method, args, kwargs]
         )
     
     def search(self, model: str, domain: List, limit: int = 0) -> List[int]:
+        """Busca registros"""
         opts = {"limit": limit} if limit else {}
         return self.execute_kw(model, "search", [domain], opts)
     
     def search_read(self, model: str, domain: List, fields: List[str], limit: int = 0) -> List[Dict]:
+        """Busca y lee registros"""
         opts = {"fields": fields}
         if limit:
             opts["limit"] = limit
         return self.execute_kw(model, "search_read", [domain], opts)
     
+    def read(self, model: str, ids: List[int], fields: List[str]) -> List[Dict]:
+        """Lee registros por IDs"""
+        return self.execute_kw(model, "read", [ids, fields])
+    
     def create(self, model: str, vals: Dict) -> int:
+        """Crea un registro"""
         return self.execute_kw(model, "create", [vals])
     
+    def create_batch(self, model: str, vals_list: List[Dict]) -> List[int]:
+        """Crea varios registros en un único round-trip (create acepta una lista)"""
+        return self.execute_kw(model, "create", [vals_list])
+    
     def write(self, model: str, ids: List[int], vals: Dict) -> bool:
+        """Actualiza registros"""
         return self.execute_kw(model, "write", [ids, vals])
 
 
+class OdooClientPool:
+    """
+    Pool acotado de OdooClient para los hilos de importación.
+    
+    Cada cliente se autentica una sola vez y se devuelve al pool al terminar
+    el lote; a lo sumo hay `size` clientes (y conexiones) abiertos a la vez.
+    Se crean a demanda, reutilizando primero el cliente recibido.
+    """
+    
+    def __init__(self, client: OdooClient, size: int):
+        self._template = client
+        self._idle: "queue.LifoQueue[OdooClient]" = queue.LifoQueue()
+        self._idle.put(client)
+        self._slots = threading.BoundedSemaphore(size)
+    
+    @contextmanager
+    def client(self) -> Iterator[OdooClient]:
+        """Presta un cliente libre (o crea uno) mientras dure el bloque with"""
+        with self._slots:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                template = self._template
+                client = OdooClient(template.url, template.db, template.user, template.password)
+            try:
+                yield client
+            finally:
+                self._idle.put(client)
+
+
 # =============================================================================
 # IMPORTADOR DE CLIENTES
 # =============================================================================
@@ -329,11 +787,11 @@ class CustomerImporter:
         
         # Lock para operaciones thread-safe
         self._lock = threading.Lock()
+        self._pool: Optional[OdooClientPool] = None
         
         # Cache
         self._iva_type_cache: Dict[str, int] = {}
-        self._existing_by_ref: Dict[str, int] = {}
-        self._existing_by_vat: Dict[str, int] = {}
+        self._iva_code_to_id: Dict[str, int] = {}
         self._country_ar_id: Optional[int] = None
         self._state_misiones_id: Optional[int] = None
         self._state_caba_id: Optional[int] = None
@@ -341,40 +799,34 @@ class CustomerImporter:
         self._id_type_cuit: Optional[int] = None
         self._id_type_dni: Optional[int] = None
         self._city_to_state: Dict[str, int] = {}
+        self._state_by_city: Dict[str, Optional[int]] = {}
     
-    def import_customers(self, customers: List[LegacyCustomer], num_threads: int = NUM_THREADS) -> ImportResult:
-        """Importa los clientes a Odoo usando múltiples hilos"""
-        logger.info(f"{'[DRY-RUN] ' if self.dry_run else ''}Iniciando importación de {len(customers)} clientes con {num_threads} hilos")
+    def import_customers(self, customers: Iterable[LegacyCustomer], num_threads: int = NUM_THREADS,
+                         batch_size: int = BATCH_SIZE, pool_size: Optional[int] = None) -> ImportResult:
+        """
+        Importa los clientes a Odoo en lotes, usando múltiples hilos.
         
-        self.result.total_rows = len(customers)
+        customers puede ser una lista o un generador (LegacyCustomerParser.
+        iter_customers): los lotes se arman a medida que llegan y pasan a los
+        hilos por una cola acotada, así la lectura y la importación se solapan
+        y en memoria hay a lo sumo unos pocos lotes pendientes.
+        pool_size limita las conexiones a Odoo (default: una por hilo).
+        """
+        logger.info(f"{'[DRY-RUN] ' if self.dry_run else ''}Iniciando importación con {num_threads} hilos")
         
         try:
             self._init_cache()
             
-            # Filtrar clientes válidos
-            valid_customers = []
-            for customer in customers:
-                if not customer.is_valid:
-                    self.result.invalid_customers += 1
-                else:
-                    self.result.valid_customers += 1
-                    valid_customers.append(customer)
+            # Un lote = una búsqueda de existentes + un create masivo
+            batches = self._iter_batches(self._unique_valid(customers), batch_size)
             
-            # Procesar en paralelo
             if self.dry_run:
                 # En dry-run, procesar secuencialmente para mantener orden del log
-                for customer in valid_customers:
-                    self._process_customer(customer)
+                for batch in batches:
+                    self._process_batch(batch, self.client)
             else:
-                # En ejecución real, usar ThreadPoolExecutor
-                with ThreadPoolExecutor(max_workers=num_threads) as executor:
-                    futures = {executor.submit(self._process_customer_threaded, c): c for c in valid_customers}
-                    for future in as_completed(futures):
-                        customer = futures[future]
-                        try:
-                            future.result()
-                        except Exception as e:
-                            logger.error(f"Error procesando {customer.name}: {e}")
+                self._pool = OdooClientPool(self.client, pool_size or num_threads)
+                self._run_pipeline(batches, num_threads)
             
             self._log_summary()
             
@@ -384,13 +836,47 @@ class CustomerImporter:
         
         return self.result
     
-    def _process_customer_threaded(self, customer: LegacyCustomer):
-        """Wrapper thread-safe para procesar cliente"""
-        # Cada hilo necesita su propia conexión XML-RPC
-        thread_client = OdooClient(
-            ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD
-        )
-        self._process_customer_with_client(customer, thread_client)
+    def _run_pipeline(self, batches: Iterator[List[LegacyCustomer]], num_threads: int):
+        """Productor (este hilo arma lotes) y num_threads consumidores contra Odoo"""
+        pending: "queue.Queue[Optional[List[LegacyCustomer]]]" = queue.Queue(maxsize=num_threads * 2)
+        workers = [
+            threading.Thread(target=self._batch_worker, args=(pending,), daemon=True)
+            for _ in range(num_threads)
+        ]
+        for worker in workers:
+            worker.start()
+        
+        try:
+            for batch in batches:
+                pending.put(batch)
+        finally:
+            # Un None por hilo para que terminen aunque la lectura falle
+            for _ in workers:
+                pending.put(None)
+            for worker in workers:
+                worker.join()
+    
+    def _batch_worker(self, pending: "queue.Queue[Optional[List[LegacyCustomer]]]"):
+        """Consume lotes de la cola hasta recibir None"""
+        while True:
+            batch = pending.get()
+            if batch is None:
+                return
+            try:
+                self._process_batch_threaded(batch)
+            except Exception as e:
+                # Sin esto el lote desaparece del resultado y el resumen se ve limpio
+                logger.error("Error procesando lote de %s clientes desde %s: %s", len(batch), batch[0].code, e)
+                with self._lock:
+                    self.result.errors.append(
+                        f"Error procesando lote de {len(batch)} clientes desde {batch[0].code}: {str(e)}"
+                    )
+    
+    def _process_batch_threaded(self, batch: List[LegacyCustomer]):
+        """Wrapper thread-safe para procesar un lote"""
+        # OdooClient no es thread-safe: cada lote usa un cliente prestado del pool
+        with self._pool.client() as client:
+            self._process_batch(batch, client)
     
     def _init_cache(self):
         """Inicializa caches de datos existentes"""
@@ -412,6 +898,12 @@ class CustomerImporter:
         )
         for iva in iva_types:
             self._iva_type_cache[iva["name"]] = iva["id"]
+        # Código legacy → ID, para resolver con un solo dict.get por cliente
+        self._iva_code_to_id = {
+            code: self._iva_type_cache[name]
+            for code, name in IVA_TYPE_MAP.items()
+            if name in self._iva_type_cache
+        }
         logger.info(f"Tipos IVA cargados: {len(self._iva_type_cache)}")
         
         # Cargar tipos de identificación (CUIT, DNI)
@@ -431,7 +923,7 @@ class CustomerImporter:
         states = self.client.search_read(
             "res.country.state",
             [("country_id", "=", self._country_ar_id)],
-            ["id", "name", "code"]
+            ["id", "name"]
         )
         for state in states:
             if state["name"] == "Misiones":
@@ -483,97 +975,164 @@ class CustomerImporter:
             "MAR DEL PLATA SUR": self._state_bsas_id,
             "LOMA HERMOSA": self._state_bsas_id,
         }
-        
-        # Cargar partners existentes por ref
-        partners = self.client.search_read(
-            "res.partner",
-            [("ref", "!=", False)],
-            ["id", "ref", "vat"]
-        )
-        for p in partners:
-            if p.get("ref"):
-                self._existing_by_ref[str(p["ref"])] = p["id"]
-            if p.get("vat"):
-                vat_clean = re.sub(r'[^0-9]', '', p["vat"])
-                self._existing_by_vat[vat_clean] = p["id"]
-        
-        logger.info(f"Partners existentes por ref: {len(self._existing_by_ref)}")
-        logger.info(f"Partners existentes por VAT: {len(self._existing_by_vat)}")
+        # Claves sin tildes: "OBERÁ" y "OBERA" quedan en una sola entrada
+        self._city_to_state = {
+            _normalize_city(city): state_id for city, state_id in self._city_to_state.items()
+        }
+        self._state_by_city.clear()
     
     def _get_iva_type_id(self, iva_code: str) -> Optional[int]:
         """Obtiene ID del tipo de responsabilidad AFIP"""
         if not iva_code:
             return None
         
-        iva_code_upper = iva_code.upper().strip()
-        iva_name = IVA_TYPE_MAP.get(iva_code_upper)
-        
-        if not iva_name:
-            return None
-        
-        return self._iva_type_cache.get(iva_name)
+        return self._iva_code_to_id.get(iva_code.upper().strip())
     
     def _get_state_from_city(self, city: str) -> Optional[int]:
         """Obtiene ID de provincia basándose en la ciudad"""
         if not city:
             return self._state_misiones_id  # Default: Misiones
         
-        city_upper = city.upper().strip()
+        city_key = _normalize_city(city)
+        
+        # Ciudades repetidas: resolver una sola vez por valor distinto
+        if city_key in self._state_by_city:
+            return self._state_by_city[city_key]
         
         # Buscar en mapeo directo
-        if city_upper in self._city_to_state:
-            return self._city_to_state[city_upper]
+        state_id = self._city_to_state.get(city_key)
         
         # Buscar parcialmente
-        for mapped_city, state_id in self._city_to_state.items():
-            if mapped_city in city_upper or city_upper in mapped_city:
-                return state_id
+        if state_id is None:
+            for mapped_city, mapped_state_id in self._city_to_state.items():
+                if mapped_city in city_key or city_key in mapped_city:
+                    state_id = mapped_state_id
+                    break
+            else:
+                # Default: Misiones (la mayoría de clientes son de ahí)
+                state_id = self._state_misiones_id
         
-        # Default: Misiones (la mayoría de clientes son de ahí)
-        return self._state_misiones_id
+        self._state_by_city[city_key] = state_id
+        return state_id
     
-    def _find_existing_partner(self, customer: LegacyCustomer) -> Optional[int]:
+    def _load_existing_partners(self, batch: List[LegacyCustomer], client: 'OdooClient') -> tuple:
+        """
+        Resuelve en un solo search_read qué clientes del lote ya existen.
+        
+        Retorna (por ref, por CUIT) solo para este lote: como los duplicados
+        del Excel se descartan antes, ningún otro lote vuelve a consultarlos y
+        la memoria queda acotada al tamaño del lote en vez de crecer con la
+        cantidad de partners.
+        """
+        codes = [c.code for c in batch]
+        vats = []
+        for c in batch:
+            if c.vat_clean:
+                vats.append(c.vat_clean)
+                if c.is_cuit:
+                    # Partners cargados a mano suelen tener el CUIT con guiones
+                    vats.append(f"{c.vat_clean[:2]}-{c.vat_clean[2:10]}-{c.vat_clean[10:]}")
+        
+        domain = [("ref", "in", codes)]
+        if vats:
+            domain = ["|"] + domain + [("vat", "in", vats)]
+        
+        partners = client.search_read("res.partner", domain, ["id", "ref", "vat"])
+        
+        by_ref: Dict[str, int] = {}
+        by_vat: Dict[str, int] = {}
+        for p in partners:
+            if p.get("ref"):
+                by_ref.setdefault(str(p["ref"]), p["id"])
+            if p.get("vat"):
+                by_vat.setdefault(_digits_only(p["vat"]), p["id"])
+        return by_ref, by_vat
+    
+    def _find_existing_partner(self, customer: LegacyCustomer, by_ref: Dict[str, int],
+                               by_vat: Dict[str, int]) -> Optional[int]:
         """Busca si el partner ya existe"""
         # Buscar por ref (código legacy)
-        if customer.code in self._existing_by_ref:
-            return self._existing_by_ref[customer.code]
+        if customer.code in by_ref:
+            return by_ref[customer.code]
         
-        # Buscar por CUIT
-        if customer.cuit:
-            cuit_clean = re.sub(r'[^0-9]', '', customer.cuit)
-            if cuit_clean in self._existing_by_vat:
-                return self._existing_by_vat[cuit_clean]
+        # Buscar por CUIT (ya normalizado en el parser)
+        if customer.vat_clean:
+            return by_vat.get(customer.vat_clean)
         
         return None
     
-    def _process_customer(self, customer: LegacyCustomer):
-        """Procesa un cliente individual (usa cliente por defecto)"""
-        self._process_customer_with_client(customer, self.client)
-    
-    def _process_customer_with_client(self, customer: LegacyCustomer, client: 'OdooClient'):
-        """Procesa un cliente individual con un cliente XML-RPC específico"""
-        # Check de existencia es thread-safe gracias al lock
-        with self._lock:
-            existing_id = self._find_existing_partner(customer)
+    def _unique_valid(self, customers: Iterable[LegacyCustomer]) -> Iterator[LegacyCustomer]:
+        """
+        Cuenta filas y emite solo clientes válidos no repetidos.
         
-        if existing_id:
-            if self.update_existing:
-                self._update_customer_with_client(customer, existing_id, client)
-            else:
-                self._log(f"SKIP (existe): {customer.code} - {customer.name} (ID: {existing_id})")
+        Los duplicados del Excel (mismo código o CUIT) se descartan antes de
+        consultar Odoo; gana la primera aparición. Corre en el hilo productor
+        mientras los workers ya procesan lotes: los contadores van bajo _lock.
+        """
+        first_by_key: Dict[tuple, LegacyCustomer] = {}
+        for customer in customers:
+            with self._lock:
+                self.result.total_rows += 1
+                if customer.is_valid:
+                    self.result.valid_customers += 1
+                else:
+                    self.result.invalid_customers += 1
+            if not customer.is_valid:
+                continue
+            
+            keys = [("ref", customer.code)]
+            if customer.vat_clean:
+                keys.append(("vat", customer.vat_clean))
+            
+            original = next((first_by_key[k] for k in keys if k in first_by_key), None)
+            if original is not None:
+                self._log(
+                    "SKIP (duplicado en el Excel): %s - %s (fila %s, igual a fila %s)",
+                    customer.code, customer.name, customer.row_number, original.row_number,
+                )
                 with self._lock:
                     self.result.customers_skipped += 1
-            return
-        
-        # Crear nuevo
-        self._create_customer_with_client(customer, client)
+                continue
+            
+            for k in keys:
+                first_by_key[k] = customer
+            yield customer
     
-    def _create_customer(self, customer: LegacyCustomer):
-        """Crea un nuevo cliente en Odoo (usa cliente por defecto)"""
-        self._create_customer_with_client(customer, self.client)
+    @staticmethod
+    def _iter_batches(customers: Iterator[LegacyCustomer], batch_size: int) -> Iterator[List[LegacyCustomer]]:
+        """Agrupa el flujo de clientes en listas de hasta batch_size"""
+        while True:
+            batch = list(itertools.islice(customers, batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def _process_batch(self, batch: List[LegacyCustomer], client: 'OdooClient'):
+        """Procesa un lote: una búsqueda de existentes y un create masivo"""
+        by_ref, by_vat = self._load_existing_partners(batch, client)
+        
+        to_create: List[LegacyCustomer] = []
+        to_update: List[tuple] = []
+        for customer in batch:
+            existing_id = self._find_existing_partner(customer, by_ref, by_vat)
+            
+            if existing_id:
+                if self.update_existing:
+                    to_update.append((customer, existing_id))
+                else:
+                    self._log("SKIP (existe): %s - %s (ID: %s)", customer.code, customer.name, existing_id)
+                    with self._lock:
+                        self.result.customers_skipped += 1
+            else:
+                to_create.append(customer)
+        
+        if to_update:
+            self._update_customers_with_client(to_update, client)
+        if to_create:
+            self._create_customers_with_client(to_create, client)
     
-    def _create_customer_with_client(self, customer: LegacyCustomer, client: 'OdooClient'):
-        """Crea un nuevo cliente en Odoo con un cliente XML-RPC específico"""
+    def _build_create_vals(self, customer: LegacyCustomer) -> Dict[str, Any]:
+        """Arma los valores de res.partner para un cliente nuevo"""
         vals = {
             "name": customer.name,
             "ref": customer.code,
@@ -619,34 +1178,56 @@ class CustomerImporter:
         if iva_type_id:
             vals["l10n_ar_afip_responsibility_type_id"] = iva_type_id
         
+        return vals
+    
+    def _create_customers_with_client(self, customers: List[LegacyCustomer], client: 'OdooClient'):
+        """Crea varios clientes con un único create masivo (lista de vals)"""
+        vals_list = [self._build_create_vals(c) for c in customers]
+        
         if self.dry_run:
-            self._log(f"[DRY-RUN] Crearía: {customer.code} - {customer.name}")
+            for customer in customers:
+                self._log("[DRY-RUN] Crearía: %s - %s", customer.code, customer.name)
             with self._lock:
-                self.result.customers_created += 1
-        else:
-            try:
-                partner_id = client.create("res.partner", vals)
-                with self._lock:
-                    self.result.created_ids.append(partner_id)
-                    self.result.customers_created += 1
-                    # Actualizar cache
-                    self._existing_by_ref[customer.code] = partner_id
-                    if customer.cuit:
-                        cuit_clean = re.sub(r'[^0-9]', '', customer.cuit)
-                        self._existing_by_vat[cuit_clean] = partner_id
-                self._log(f"Creado: {customer.code} - {customer.name} (ID: {partner_id})")
-                    
-            except Exception as e:
-                with self._lock:
-                    self.result.errors.append(f"Error creando {customer.name}: {str(e)}")
-                logger.error(f"Error creando {customer.name}: {e}")
+                self.result.customers_created += len(customers)
+            return
+        
+        try:
+            partner_ids = client.create_batch("res.partner", vals_list)
+        except Exception as e:
+            # Un registro inválido hace fallar todo el lote: reintentar de a uno
+            logger.warning(f"Create masivo falló ({len(customers)} clientes), reintentando individualmente: {e}")
+            for customer, vals in zip(customers, vals_list):
+                self._create_customer_with_client(customer, vals, client)
+            return
+        
+        for customer, partner_id in zip(customers, partner_ids):
+            self._register_created(customer, partner_id)
+    
+    def _create_customer_with_client(self, customer: LegacyCustomer, vals: Dict[str, Any], client: 'OdooClient'):
+        """Crea un nuevo cliente en Odoo con un cliente Odoo específico"""
+        try:
+            partner_id = client.create("res.partner", vals)
+        except Exception as e:
+            with self._lock:
+                self.result.errors.append(f"Error creando {customer.name}: {str(e)}")
+            logger.error(f"Error creando {customer.name}: {e}")
+            return
+        
+        self._register_created(customer, partner_id)
+    
+    def _register_created(self, customer: LegacyCustomer, partner_id: int):
+        """Actualiza resultado tras crear un partner"""
+        with self._lock:
+            self.result.created_ids.append(partner_id)
+            self.result.customers_created += 1
+        self._log("Creado: %s - %s (ID: %s)", customer.code, customer.name, partner_id)
     
     def _update_customer(self, customer: LegacyCustomer, partner_id: int):
         """Actualiza un cliente existente (usa cliente por defecto)"""
         self._update_customer_with_client(customer, partner_id, self.client)
     
-    def _update_customer_with_client(self, customer: LegacyCustomer, partner_id: int, client: 'OdooClient'):
-        """Actualiza un cliente existente con un cliente XML-RPC específico"""
+    def _build_update_vals(self, customer: LegacyCustomer) -> Dict[str, Any]:
+        """Campos a actualizar en un partner existente (solo los que vienen cargados)"""
         vals = {}
         
         if customer.street:
@@ -664,14 +1245,67 @@ class CustomerImporter:
         if iva_type_id:
             vals["l10n_ar_afip_responsibility_type_id"] = iva_type_id
         
+        return vals
+    
+    def _update_customers_with_client(self, updates: List[tuple], client: 'OdooClient'):
+        """
+        Actualiza los existentes de un lote: un write por cada payload distinto.
+        
+        updates es una lista de (cliente, partner_id). Los partners con los
+        mismos valores a escribir se agrupan en un único write con todos sus IDs.
+        """
+        groups: Dict[tuple, List[tuple]] = {}
+        for customer, partner_id in updates:
+            vals = self._build_update_vals(customer)
+            if not vals:
+                self._log("SKIP (sin cambios): %s - %s", customer.code, customer.name)
+                with self._lock:
+                    self.result.customers_skipped += 1
+                continue
+            groups.setdefault(tuple(sorted(vals.items())), []).append((customer, partner_id))
+        
+        for key, members in groups.items():
+            if self.dry_run:
+                for customer, _ in members:
+                    self._log("[DRY-RUN] Actualizaría: %s - %s", customer.code, customer.name)
+                with self._lock:
+                    self.result.customers_updated += len(members)
+                continue
+            
+            vals = dict(key)
+            try:
+                client.write("res.partner", [partner_id for _, partner_id in members], vals)
+            except Exception as e:
+                if len(members) == 1:
+                    customer = members[0][0]
+                    with self._lock:
+                        self.result.errors.append(f"Error actualizando {customer.name}: {str(e)}")
+                    continue
+                # Un registro inválido hace fallar el write completo: aislarlo
+                logger.warning(f"Falló write agrupado de {len(members)} partners, reintentando uno a uno: {e}")
+                for customer, partner_id in members:
+                    self._update_customer_with_client(customer, partner_id, client, vals)
+                continue
+            
+            with self._lock:
+                self.result.customers_updated += len(members)
+            for customer, partner_id in members:
+                self._log("Actualizado: %s - %s (ID: %s)", customer.code, customer.name, partner_id)
+    
+    def _update_customer_with_client(self, customer: LegacyCustomer, partner_id: int, client: 'OdooClient',
+                                     vals: Optional[Dict[str, Any]] = None):
+        """Actualiza un cliente existente con un cliente Odoo específico"""
+        if vals is None:
+            vals = self._build_update_vals(customer)
+        
         if not vals:
-            self._log(f"SKIP (sin cambios): {customer.code} - {customer.name}")
+            self._log("SKIP (sin cambios): %s - %s", customer.code, customer.name)
             with self._lock:
                 self.result.customers_skipped += 1
             return
         
         if self.dry_run:
-            self._log(f"[DRY-RUN] Actualizaría: {customer.code} - {customer.name}")
+            self._log("[DRY-RUN] Actualizaría: %s - %s", customer.code, customer.name)
             with self._lock:
                 self.result.customers_updated += 1
         else:
@@ -679,7 +1313,7 @@ class CustomerImporter:
                 client.write("res.partner", [partner_id], vals)
                 with self._lock:
                     self.result.customers_updated += 1
-                self._log(f"Actualizado: {customer.code} - {customer.name} (ID: {partner_id})")
+                self._log("Actualizado: %s - %s (ID: %s)", customer.code, customer.name, partner_id)
             except Exception as e:
                 with self._lock:
                     self.result.errors.append(f"Error actualizando {customer.name}: {str(e)}")
@@ -688,16 +1322,14 @@ class CustomerImporter:
         """Determina si es empresa basándose en el nombre"""
         if not name:
             return False
-        name_upper = name.upper()
-        company_indicators = ['S.A.', 'SA ', 'SRL', 'S.R.L.', 'SAS', 'S.A.S.', 
-                             'SOCIEDAD', 'EMPRESA', 'CIA', 'COMPAÑIA', 'LTDA',
-                             'S.C.', 'S.H.', 'COOPERATIVA', 'FUNDACION']
-        return any(ind in name_upper for ind in company_indicators)
+        return _COMPANY_INDICATORS.search(name.upper()) is not None
     
-    def _log(self, message: str):
-        """Registra mensaje"""
-        logger.info(message)
-        self.result.log_entries.append(message)
+    def _log(self, message: str, *args):
+        """Registra mensaje (formato %s diferido: no se arma si INFO está apagado)"""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info(message, *args)
+        self.result.log_entries.append(message % args if args else message)
     
     def _log_summary(self):
         """Registra resumen"""
@@ -750,6 +1382,12 @@ Ejemplos:
     parser.add_argument("--dry-run", "-d", action="store_true", help="Simular importación")
     parser.add_argument("--execute", "-x", action="store_true", help="Ejecutar importación real")
     parser.add_argument("--update-existing", "-u", action="store_true", help="Actualizar clientes existentes")
+    parser.add_argument("--threads", "-t", type=int, default=NUM_THREADS,
+                        help=f"Hilos (lotes en paralelo) para la importación real (default: {NUM_THREADS})")
+    parser.add_argument("--batch-size", "-b", type=int, default=BATCH_SIZE,
+                        help=f"Clientes por lote (una búsqueda + un create por lote, default: {BATCH_SIZE})")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="Conexiones a Odoo abiertas a la vez (default: igual a --threads)")
     parser.add_argument("--url", default=ODOO_URL, help="URL de Odoo")
     parser.add_argument("--db", default=ODOO_DB, help="Base de datos Odoo")
     parser.add_argument("--user", default=ODOO_USER, help="Usuario Odoo")
@@ -775,18 +1413,24 @@ Ejemplos:
     parser_obj = LegacyCustomerParser(args.excel)
     customers = parser_obj.parse()
     
-    valid = [c for c in customers if c.is_valid]
-    invalid = [c for c in customers if not c.is_valid]
+    # Estadísticas en una sola pasada
+    valid = []
+    with_cuit = with_email = with_phone = 0
+    for c in customers:
+        if not c.is_valid:
+            continue
+        valid.append(c)
+        if c.cuit:
+            with_cuit += 1
+        if c.email and '@' in c.email:
+            with_email += 1
+        if c.phone:
+            with_phone += 1
     
     print(f"\n📊 Archivo:           {args.excel}")
     print(f"📄 Total filas:       {len(customers)}")
     print(f"✅ Clientes válidos:  {len(valid)}")
-    print(f"❌ Clientes inválidos:{len(invalid)}")
-    
-    # Estadísticas de campos
-    with_cuit = len([c for c in valid if c.cuit])
-    with_email = len([c for c in valid if c.email and '@' in c.email])
-    with_phone = len([c for c in valid if c.phone])
+    print(f"❌ Clientes inválidos:{len(customers) - len(valid)}")
     
     print(f"\n📈 ESTADÍSTICAS:")
     print(f"   Con CUIT:     {with_cuit} ({100*with_cuit/len(valid):.1f}%)")
@@ -822,30 +1466,38 @@ Ejemplos:
         update_existing=args.update_existing
     )
     
-    result = importer.import_customers(valid)
+    result = importer.import_customers(
+        valid,
+        num_threads=max(1, args.threads),
+        batch_size=max(1, args.batch_size),
+        pool_size=max(1, args.pool_size) if args.pool_size else None,
+    )
     
-    # Resultados
-    print("\n" + "=" * 60)
-    print(f"{'[DRY-RUN] ' if args.dry_run else ''}RESULTADO DE LA IMPORTACIÓN")
-    print("=" * 60)
-    print(f"✅ Clientes creados:      {result.customers_created}")
-    print(f"🔄 Clientes actualizados: {result.customers_updated}")
-    print(f"⏭️  Clientes omitidos:     {result.customers_skipped}")
+    # Resultados: se arma el bloque completo y se escribe de una sola vez
+    lines = [
+        "",
+        "=" * 60,
+        f"{'[DRY-RUN] ' if args.dry_run else ''}RESULTADO DE LA IMPORTACIÓN",
+        "=" * 60,
+        f"✅ Clientes creados:      {result.customers_created}",
+        f"🔄 Clientes actualizados: {result.customers_updated}",
+        f"⏭️  Clientes omitidos:     {result.customers_skipped}",
+    ]
     
     if result.errors:
-        print(f"\n❌ ERRORES ({len(result.errors)}):")
-        for e in result.errors[:10]:
-            print(f"   - {e}")
+        lines.append(f"\n❌ ERRORES ({len(result.errors)}):")
+        lines.extend(f"   - {e}" for e in result.errors[:10])
     
     if args.dry_run:
-        print("\n💡 Este fue un DRY-RUN. Para ejecutar realmente, use --execute")
+        lines.append("\n💡 Este fue un DRY-RUN. Para ejecutar realmente, use --execute")
     else:
-        print("\n✅ Importación completada exitosamente")
+        lines.append("\n✅ Importación completada exitosamente")
         if result.created_ids:
-            print(f"   IDs creados: {result.created_ids[:20]}")
+            lines.append(f"   IDs creados: {result.created_ids[:20]}")
             if len(result.created_ids) > 20:
-                print(f"   ... y {len(result.created_ids) - 20} más")
-
+                lines.append(f"   ... y {len(result.created_ids) - 20} más")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()
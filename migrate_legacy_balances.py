@@ -32,14 +32,27 @@ FECHA: 2026-01-31
 """
 
 import argparse
+import array
+import functools
+import gzip
+import http.client
+import itertools
+import json
 import logging
 import os
+import queue
 import re
 import sys
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 import hashlib
+from xml.etree import ElementTree
+import urllib.parse
 
 # =============================================================================
 # CONFIGURACIÓN
@@ -61,6 +74,20 @@ DEFAULT_JOURNAL_CODE = "MISC"  # Diario Misceláneos
 # Prefijo para referencias de asientos (para idempotencia)
 MOVE_REF_PREFIX = "MIGLEG"
 
+# Asientos por llamada create (un round-trip por lote en vez de uno por asiento)
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "200"))
+
+# Hashes por consulta de asientos ya migrados: cada uno es un término
+# ref =like "MIGLEG/<hash>%" del dominio (acota el OR en archivos muy grandes)
+EXISTING_MOVES_CHUNK = 1000
+
+# Hilos (cada uno con su conexión) para buscar y crear partners en paralelo;
+# conviene que no supere la cantidad de workers de Odoo
+NUM_THREADS = int(os.getenv("NUM_THREADS", "4"))
+
+# Entradas de log retenidas en memoria en MigrationResult.log_entries
+LOG_ENTRIES_MAX = 10000
+
 # =============================================================================
 # LOGGING
 # =============================================================================
@@ -72,16 +99,145 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+# Número entero escrito como float ("3.0", "00012345.00")
+_INTEGRAL_FLOAT = re.compile(r"(\d+)\.0+")
+
+
+def _integral_text(value: str) -> str:
+    """Quita la parte decimal nula de un número leído como texto ("3.0" -> "3")"""
+    match = _INTEGRAL_FLOAT.fullmatch(value)
+    return match.group(1) if match else value
+
+
+# Caracteres que se descartan de un monto: símbolo de moneda y espacios
+_AMOUNT_JUNK = str.maketrans("", "", "$ \xa0")
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_amount_text(value_str: str) -> Optional[float]:
+    """
+    Parsea un monto escrito como texto ("1500.5", "$ 1.234,56").
+    
+    Con cache: los reportes repiten los mismos importes ("0,00", cuotas fijas)
+    y así la limpieza de cada texto distinto se hace una sola vez.
+    """
+    if not value_str or value_str == '$':
+        return None
+    
+    # Caso común: el lector entrega el número ya como texto ("1500.5")
+    try:
+        return float(value_str)
+    except ValueError:
+        pass
+    
+    # Limpiar caracteres de moneda y espacios (una sola pasada en C)
+    value_str = value_str.translate(_AMOUNT_JUNK)
+    
+    # Manejar formato argentino (punto miles, coma decimal)
+    if ',' in value_str and '.' in value_str:
+        if value_str.rfind(',') > value_str.rfind('.'):
+            # Coma es decimal
+            value_str = value_str.replace('.', '').replace(',', '.')
+        else:
+            # Punto es decimal
+            value_str = value_str.replace(',', '')
+    elif ',' in value_str:
+        # Solo coma -> es decimal
+        value_str = value_str.replace(',', '.')
+    
+    try:
+        return float(value_str)
+    except ValueError:
+        return None
+
+
+# Fechas como número de serie de Excel (sistema 1900): días desde 30/12/1899.
+# Se acota a 1900-2099 para no tomar importes o números de documento como fecha.
+EXCEL_EPOCH = date(1899, 12, 30)
+_EXCEL_SERIAL = re.compile(r"(\d{1,5})(?:\.\d*)?")
+_EXCEL_SERIAL_MAX = 73050  # 31/12/2099
+
+
+def _excel_serial_date(text: str) -> Optional[date]:
+    """Convierte un serial de Excel leído como texto ("45992" o "45992.5") a fecha"""
+    match = _EXCEL_SERIAL.fullmatch(text)
+    if not match:
+        return None
+    days = int(match.group(1))
+    if not 1 <= days <= _EXCEL_SERIAL_MAX:
+        return None
+    return EXCEL_EPOCH + timedelta(days=days)
+
+
+# Formatos de fecha como texto, en orden de prueba
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%Y/%m/%d',
+)
+
+# Un formato solo puede coincidir si el texto contiene su separador: agrupados
+# así se evita probar (y lanzar ValueError en) los formatos imposibles
+_DATE_FORMATS_BY_SEP = {sep: tuple(f for f in DATE_FORMATS if sep in f) for sep in "-/."}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_text(date_str: str) -> Optional[date]:
+    """
+    Parsea una fecha escrita como texto probando DATE_FORMATS.
+    
+    Con cache: los reportes repiten las mismas fechas (ciclos de facturación)
+    miles de veces y cada strptime fallido lanza una excepción. Solo se
+    prueban los formatos con el separador presente, y "AAAA-MM-DD" va
+    directo a date.fromisoformat.
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+    
+    for sep, formats in _DATE_FORMATS_BY_SEP.items():
+        if sep not in date_str:
+            continue
+        for fmt in formats:
+            try:
+                return datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_iso(value: date) -> str:
+    """date.isoformat() con cache: muchas facturas comparten fecha y vencimiento"""
+    return value.isoformat()
+
+
+# Primera palabra de una celda: todo hasta el primer ':' o espacio
+_FIRST_WORD = re.compile(r"[^:\s]*")
+
+
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+# Dataclasses con __slots__ donde el intérprete lo soporta (3.10+)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class LegacyInvoice:
     """Representa una factura/documento del sistema legacy"""
     # Identificación
     row_number: int
-    unique_hash: str = ""
     
     # Cliente
     customer_code: str = ""
@@ -116,18 +272,47 @@ class LegacyInvoice:
     is_valid: bool = True
     validation_errors: List[str] = field(default_factory=list)
     
-    def __post_init__(self):
-        """Genera hash único para idempotencia"""
-        self._regenerate_hash()
+    # Valores derivados calculados a demanda (ver unique_hash y document_reference)
+    _unique_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _document_reference: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
-    def _regenerate_hash(self):
-        """Regenera el hash con los datos actuales"""
+    @property
+    def unique_hash(self) -> str:
+        """
+        Hash único para idempotencia, calculado al primer uso.
+        
+        Se guarda en la referencia de los asientos ya migrados: el algoritmo
+        (md5, 12 caracteres) y sus campos no deben cambiar o una re-ejecución
+        duplicaría asientos.
+        """
+        if self._unique_hash is None:
+            self._unique_hash = hashlib.md5(self.hash_input.encode()).hexdigest()[:12]
+        return self._unique_hash
+    
+    @property
+    def hash_input(self) -> str:
+        """
+        Campos que identifican la factura, tal como entran al hash.
+        
+        Dos facturas con el mismo hash_input tienen el mismo unique_hash, así
+        que sirve para detectar duplicados sin calcular el md5 (--parse-only).
+        """
         # Incluir sucursal en el hash para diferenciar misma factura en diferentes sucursales
-        hash_input = f"{self.customer_code}|{self.customer_name}|{self.branch_name}|{self.doc_type}|{self.doc_letter}|{self.point_of_sale}|{self.doc_number}|{self.installment}|{self.pending_amount}"
-        self.unique_hash = hashlib.md5(hash_input.encode()).hexdigest()[:12]
+        return f"{self.customer_code}|{self.customer_name}|{self.branch_name}|{self.doc_type}|{self.doc_letter}|{self.point_of_sale}|{self.doc_number}|{self.installment}|{self.pending_amount}"
+    
+    def _regenerate_hash(self):
+        """Descarta hash y referencia calculados para recalcularlos con los datos actuales"""
+        self._unique_hash = None
+        self._document_reference = None
     
     @property
     def document_reference(self) -> str:
+        """Referencia legible del documento (se arma una vez y se reutiliza)"""
+        if self._document_reference is None:
+            self._document_reference = self._build_document_reference()
+        return self._document_reference
+    
+    def _build_document_reference(self) -> str:
         """Genera referencia legible del documento"""
         parts = []
         if self.doc_type:
@@ -136,13 +321,15 @@ class LegacyInvoice:
             parts.append(self.doc_letter)
         if self.point_of_sale and self.doc_number:
             # Limpiar .0 de floats parseados como string
-            pos_clean = str(self.point_of_sale).replace('.0', '')
-            num_clean = str(self.doc_number).replace('.0', '')
+            pos_clean = _integral_text(self.point_of_sale)
+            num_clean = _integral_text(self.doc_number)
             pos = pos_clean.zfill(4) if pos_clean else "0000"
             num = num_clean.zfill(8) if num_clean else "00000000"
             parts.append(f"{pos}-{num}")
-        if self.installment and str(self.installment).replace('.0', '') != "1":
-            parts.append(f"Cuota {str(self.installment).replace('.0', '')}")
+        if self.installment:
+            installment = _integral_text(self.installment)
+            if installment != "1":
+                parts.append(f"Cuota {installment}")
         return " ".join(parts) if parts else "Saldo Inicial"
     
     @property
@@ -155,7 +342,7 @@ class LegacyInvoice:
         return ref
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ParseResult:
     """Resultado del parsing del Excel"""
     invoices: List[LegacyInvoice] = field(default_factory=list)
@@ -171,7 +358,7 @@ class ParseResult:
     warnings: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class MigrationResult:
     """Resultado de la migración"""
     dry_run: bool = True
@@ -182,7 +369,8 @@ class MigrationResult:
     total_amount_migrated: float = 0.0
     errors: List[str] = field(default_factory=list)
     created_move_ids: List[int] = field(default_factory=list)
-    log_entries: List[str] = field(default_factory=list)
+    # Solo las últimas entradas: el log completo queda en la salida del logger
+    log_entries: Deque[str] = field(default_factory=lambda: deque(maxlen=LOG_ENTRIES_MAX))
 
 
 # =============================================================================
@@ -201,21 +389,71 @@ class LegacyExcelParser:
     - Filas con "Total" son subtotales a ignorar
     """
     
-    # Patrones de detección
-    BRANCH_PATTERNS = [r'^sucursal[:\s]', r'^suc[:\s]', r'^local[:\s]']
-    CUSTOMER_PATTERNS = [r'^cuenta[:\s]', r'^cliente[:\s]', r'^cod[:\s]']
-    CONTACT_PATTERNS = [r'^contacto[:\s]', r'^tel[:\s]', r'^email[:\s]']
-    TOTAL_PATTERNS = [r'^total\s', r'^subtotal\s', r'^total$']
-    HEADER_PATTERNS = [r'^tc\s', r'^tipo\s', r'^comprobante', r'^monto']
+    # Detección por la primera palabra de la primera celda (ya en minúsculas),
+    # seguida de ':' o de un espacio, como "^sucursal[:\s]". Los totales solo
+    # aceptan espacio ("^total\s") o la palabra "total" sola
+    BRANCH_WORDS = ('sucursal', 'suc', 'local')
+    CUSTOMER_WORDS = ('cuenta', 'cliente', 'cod')
+    CONTACT_WORDS = ('contacto', 'tel', 'email')
+    TOTAL_WORDS = ('total', 'subtotal')
+    
+    # Tipo de fila por palabra: una búsqueda en el dict reemplaza los chequeos
+    # de prefijo de cada categoría
+    _ROW_KIND_BY_WORD = {
+        word: kind
+        for kind, words in (
+            ("branch", BRANCH_WORDS),
+            ("customer", CUSTOMER_WORDS),
+            ("contact", CONTACT_WORDS),
+            ("total", TOTAL_WORDS),
+        )
+        for word in words
+    }
+    
+    # Encabezados: se buscan al inicio del texto de las primeras celdas. Compilado
+    # una sola vez como alternancia; sin '^' porque se aplica con match (anclado),
+    # y sin IGNORECASE porque el texto ya va en minúsculas
+    HEADER_PATTERNS = [r'tc\s', r'tipo\s', r'comprobante', r'monto']
+    _HEADER_RE = re.compile("|".join(HEADER_PATTERNS))
+    # Con qué puede empezar un encabezado (descarte rápido sin armar el texto)
+    _HEADER_STARTS = ('tc', 'tipo', 'comprobante', 'monto')
+    
+    # Columnas por fragmento de texto del encabezado (coincidencia por subcadena:
+    # 'l' toma la primera celda con una ele, por eso el orden de columnas importa)
+    COLUMN_KEYWORDS = (
+        ('tc', ('tc', 'tipo', 'comp')),
+        ('letter', ('l', 'letra')),
+        ('pos', ('boca', 'pto', 'punto', 'suc')),
+        ('number', ('num', 'nro', 'número')),
+        ('installment', ('cuota', 'cta')),
+        ('invoice_date', ('fec. fac', 'fecha fac', 'fec fac', 'f. emision')),
+        ('observations', ('obs', 'observ')),
+        ('due_date', ('venc', 'vto', 'f. venc')),
+        ('original', ('original', 'importe', 'monto')),
+        ('pending', ('pendiente', 'saldo', 'adeuda')),
+        ('overdue', ('mora', 'dias')),
+    )
     
     # Tipos de documento válidos
     DOC_TYPES = ['F/V', 'FV', 'FA', 'FB', 'FC', 'NC', 'ND', 'REC', 'RBO', 'FCE', 'NCE', 'NDE',
                  'FACT', 'FACTURA', 'NOTA DE CREDITO', 'NOTA DE DEBITO', 'RECIBO']
+    # Como tupla para un único str.startswith (el loop de Python queda en C)
+    _DOC_TYPES_TUPLE = tuple(DOC_TYPES)
     
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        reader: str = "openpyxl",
+        report_date: Optional[date] = None,
+        company_name: str = "",
+    ):
         self.file_path = file_path
+        self.reader = reader
         self.rows: List[List[Any]] = []
         self.result = ParseResult()
+        # Si el llamador ya conoce fecha y empresa del reporte no se detectan
+        self.result.report_date = report_date
+        self.result.company_name = company_name
         
     def parse(self) -> ParseResult:
         """Ejecuta el parsing completo del Excel"""
@@ -233,34 +471,120 @@ class LegacyExcelParser:
         return self.result
     
     def _load_excel(self):
-        """Carga el Excel usando openpyxl"""
+        """Carga el Excel con el lector elegido (openpyxl o python-calamine)"""
+        if self.reader == "calamine":
+            self.rows = self._load_rows_calamine()
+        else:
+            self.rows = self._load_rows_openpyxl()
+        
+        self.result.total_rows = len(self.rows)
+        logger.info(f"Cargadas {self.result.total_rows} filas")
+    
+    def _load_rows_openpyxl(self) -> List[List[Any]]:
+        """Lee la hoja activa con openpyxl en modo read_only"""
         try:
             import openpyxl
         except ImportError:
             raise ImportError("Instale openpyxl: pip install openpyxl")
         
-        wb = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
-        sheet = wb.active
-        
-        self.rows = []
-        for row in sheet.iter_rows(values_only=True):
-            # Convertir a lista de strings limpios
-            clean_row = []
-            for cell in row:
-                if cell is None:
-                    clean_row.append("")
-                elif isinstance(cell, datetime):
-                    clean_row.append(cell)
-                else:
-                    clean_row.append(str(cell).strip())
-            self.rows.append(clean_row)
+        # read_only: celdas en streaming; keep_links=False: no cargar vínculos externos
+        wb = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True, keep_links=False)
+        try:
+            sheet = wb.active
+            return [self._clean_row(row) for row in sheet.iter_rows(values_only=True)]
+        finally:
+            # En read_only el archivo queda abierto hasta cerrar el libro
+            wb.close()
+    
+    def _load_rows_calamine(self) -> List[List[Any]]:
+        """
+        Lee la hoja activa con python-calamine (decodificación nativa en Rust).
+        
+        Calamine devuelve float en toda celda numérica y date para fechas sin
+        hora; se llevan a int/datetime como los entrega openpyxl en un Excel
+        guardado normalmente. Ojo: si el archivo trae enteros escritos con
+        decimales ("20.0"), openpyxl los lee como float y el código del cliente
+        (parte del hash de idempotencia) difiere entre lectores. Re-ejecutar
+        siempre con el mismo lector.
+        """
+        try:
+            from python_calamine import CalamineWorkbook
+        except ImportError:
+            raise ImportError("Instale python-calamine: pip install python-calamine")
         
-        self.result.total_rows = len(self.rows)
-        wb.close()
-        logger.info(f"Cargadas {self.result.total_rows} filas")
+        wb = CalamineWorkbook.from_path(self.file_path)
+        sheet = wb.get_sheet_by_index(self._active_sheet_index())
+        
+        return [self._clean_calamine_row(row) for row in sheet.to_python(skip_empty_area=False)]
+    
+    @staticmethod
+    def _clean_calamine_row(row) -> List[Any]:
+        """
+        Igual que _clean_row, más la conversión de tipos de calamine, en una sola pasada.
+        
+        Los strings (la mayoría de las celdas) se resuelven con un único chequeo de tipo.
+        """
+        clean_row = []
+        for cell in row:
+            cell_type = type(cell)
+            if cell_type is str:
+                clean_row.append(cell.strip())
+            elif cell is None:
+                clean_row.append("")
+            elif cell_type is float:
+                clean_row.append(str(int(cell)) if cell.is_integer() else str(cell))
+            elif isinstance(cell, datetime):
+                clean_row.append(cell)
+            elif isinstance(cell, date):
+                clean_row.append(datetime(cell.year, cell.month, cell.day))
+            else:
+                clean_row.append(str(cell).strip())
+        return clean_row
+    
+    def _active_sheet_index(self) -> int:
+        """Posición de la hoja activa (bookViews/activeTab), 0 si no se puede leer"""
+        try:
+            with zipfile.ZipFile(self.file_path) as zf:
+                workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+        except (zipfile.BadZipFile, KeyError):
+            # .xls / .ods u otro formato sin workbook.xml
+            return 0
+        
+        ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+        view = workbook.find(f"{ns}bookViews/{ns}workbookView")
+        active = int(view.get("activeTab", 0)) if view is not None else 0
+        return active if active < len(workbook.findall(f"{ns}sheets/{ns}sheet")) else 0
+    
+    @staticmethod
+    def _clean_row(row) -> List[Any]:
+        """
+        Convierte una fila a lista de strings limpios (las fechas se conservan).
+        
+        La conversión no se difiere: los códigos y números de documento forman
+        parte del hash de idempotencia tal como quedan acá ("3.0" no es "3").
+        Lo que se evita es trabajo por celda: un solo chequeo de tipo para los
+        strings y sin strip() para los números, que nunca tienen espacios.
+        """
+        clean_row = []
+        for cell in row:
+            cell_type = type(cell)
+            if cell_type is str:
+                clean_row.append(cell.strip())
+            elif cell is None:
+                clean_row.append("")
+            elif cell_type is int or cell_type is float:
+                clean_row.append(str(cell))
+            elif isinstance(cell, datetime):
+                clean_row.append(cell)
+            else:
+                clean_row.append(str(cell).strip())
+        return clean_row
     
     def _detect_structure(self):
         """Detecta información general del reporte"""
+        if self.result.report_date is not None and self.result.company_name:
+            return
+        
         for idx, row in enumerate(self.rows[:20]):
             row_text = " ".join(str(c) for c in row if c).lower()
             
@@ -278,7 +602,8 @@ class LegacyExcelParser:
                 for cell in row:
                     if cell and isinstance(cell, str) and len(cell) > 5:
                         # Buscar texto que parezca nombre de empresa
-                        if cell.isupper() or (cell[0].isupper() and 'S.A' in cell.upper() or 'SRL' in cell.upper() or 'S.R.L' in cell.upper()):
+                        up = cell.upper()
+                        if cell.isupper() or (cell[0].isupper() and 'S.A' in up) or 'SRL' in up or 'S.R.L' in up:
                             if not any(p in cell.lower() for p in ['saldo', 'fecha', 'cuenta', 'cliente']):
                                 self.result.company_name = cell
                                 logger.info(f"Empresa detectada: {cell}")
@@ -293,30 +618,36 @@ class LegacyExcelParser:
         
         header_row_idx = None
         column_map = {}
-        
-        for idx, row in enumerate(self.rows):
-            if not row or not any(row):
-                continue
-            
-            first_cell = str(row[0]).strip().lower() if row[0] else ""
+        # Montos válidos en un buffer de doubles: se suman una sola vez al final
+        pending_amounts = array.array('d')
+        
+        # Filas vacías (separadores) fuera del loop: map(any) y compress corren
+        # en C y el cuerpo solo se ejecuta para filas con contenido
+        non_empty = itertools.compress(enumerate(self.rows), map(any, self.rows))
+        for idx, row in non_empty:
+            # Primera celda una sola vez por fila; cada chequeo usa la forma que necesita
+            first_text = str(row[0]).strip() if row[0] else ""
+            first_cell = first_text.lower()
             
             # ¿Es fila de encabezados?
-            if self._is_header_row(row):
+            if self._is_header_row(row, first_cell):
                 header_row_idx = idx
                 column_map = self._build_column_map(row)
-                logger.debug(f"Encabezados detectados en fila {idx + 1}: {column_map}")
+                logger.debug("Encabezados detectados en fila %s: %s", idx + 1, column_map)
                 continue
             
+            row_kind = self._row_kind(first_cell)
+            
             # ¿Es fila de sucursal?
-            if self._matches_pattern(first_cell, self.BRANCH_PATTERNS):
+            if row_kind == "branch":
                 current_branch = self._extract_value_after_colon(row)
                 if current_branch and current_branch not in self.result.branches:
                     self.result.branches.append(current_branch)
-                logger.debug(f"Sucursal: {current_branch}")
+                logger.debug("Sucursal: %s", current_branch)
                 continue
             
             # ¿Es fila de cliente/cuenta?
-            if self._matches_pattern(first_cell, self.CUSTOMER_PATTERNS):
+            if row_kind == "customer":
                 # Formato típico: ['Cuenta:', '20.0', 'PORTAL DEL IGUAZU S.A.', '498200.0', ...]
                 current_customer_code = str(row[1]).strip() if len(row) > 1 and row[1] else ""
                 current_customer_name = str(row[2]).strip() if len(row) > 2 and row[2] else ""
@@ -326,20 +657,20 @@ class LegacyExcelParser:
                     pass
                 if current_customer_name and current_customer_name not in self.result.customers:
                     self.result.customers.append(current_customer_name)
-                logger.debug(f"Cliente: {current_customer_code} - {current_customer_name}")
+                logger.debug("Cliente: %s - %s", current_customer_code, current_customer_name)
                 continue
             
             # ¿Es fila de contacto?
-            if self._matches_pattern(first_cell, self.CONTACT_PATTERNS):
+            if row_kind == "contact":
                 current_customer_contact = self._extract_value_after_colon(row)
                 continue
             
             # ¿Es fila de total? (ignorar)
-            if self._matches_pattern(first_cell, self.TOTAL_PATTERNS):
+            if row_kind == "total":
                 continue
             
             # ¿Es línea de factura?
-            if self._is_invoice_row(row):
+            if self._is_invoice_row(row, first_text):
                 invoice = self._parse_invoice_row(
                     row, 
                     idx + 1,
@@ -353,52 +684,63 @@ class LegacyExcelParser:
                     self.result.invoices.append(invoice)
                     if invoice.is_valid:
                         self.result.valid_invoices += 1
-                        self.result.total_amount += invoice.pending_amount
+                        pending_amounts.append(invoice.pending_amount)
                     else:
                         self.result.invalid_invoices += 1
+        
+        self.result.total_amount += sum(pending_amounts)
     
-    def _is_header_row(self, row: List) -> bool:
-        """Detecta si es fila de encabezados"""
+    def _row_kind(self, first_cell: str) -> Optional[str]:
+        """Tipo de fila (branch/customer/contact/total) según su primera palabra, o None"""
+        word_end = _FIRST_WORD.match(first_cell).end()
+        row_kind = self._ROW_KIND_BY_WORD.get(first_cell[:word_end])
+        if row_kind is None:
+            return None
+        
+        separator = first_cell[word_end:word_end + 1]
+        if row_kind == "total":
+            if separator.isspace() or first_cell == "total":
+                return row_kind
+            return None
+        # La palabra tiene que estar seguida de ':' o espacio, no ser la celda entera
+        return row_kind if separator else None
+    
+    def _is_header_row(self, row: List, first_cell: str) -> bool:
+        """Detecta si es fila de encabezados (first_cell: primera celda en minúsculas)"""
+        # El texto empieza por la primera celda: si no arranca como un
+        # encabezado, no hace falta unir las celdas ni buscar
+        if first_cell and not first_cell.startswith(self._HEADER_STARTS):
+            return False
         row_text = " ".join(str(c).lower() for c in row[:5] if c)
-        return any(re.search(p, row_text) for p in self.HEADER_PATTERNS)
+        return self._HEADER_RE.match(row_text) is not None
     
     def _build_column_map(self, row: List) -> Dict[str, int]:
         """Construye mapa de columnas basado en encabezados"""
         column_map = {}
-        keywords = {
-            'tc': ['tc', 'tipo', 'comp'],
-            'letter': ['l', 'letra'],
-            'pos': ['boca', 'pto', 'punto', 'suc'],
-            'number': ['num', 'nro', 'número'],
-            'installment': ['cuota', 'cta'],
-            'invoice_date': ['fec. fac', 'fecha fac', 'fec fac', 'f. emision'],
-            'observations': ['obs', 'observ'],
-            'due_date': ['venc', 'vto', 'f. venc'],
-            'original': ['original', 'importe', 'monto'],
-            'pending': ['pendiente', 'saldo', 'adeuda'],
-            'overdue': ['mora', 'dias'],
-        }
         
         for idx, cell in enumerate(row):
-            cell_lower = str(cell).lower().strip() if cell else ""
-            for key, patterns in keywords.items():
-                if any(p in cell_lower for p in patterns):
-                    if key not in column_map:  # Primera coincidencia
-                        column_map[key] = idx
+            if not cell:
+                continue
+            cell_lower = str(cell).lower().strip()
+            for key, patterns in self.COLUMN_KEYWORDS:
+                # Primera coincidencia: las columnas ya ubicadas no se vuelven a buscar
+                if key not in column_map and any(p in cell_lower for p in patterns):
+                    column_map[key] = idx
+            if len(column_map) == len(self.COLUMN_KEYWORDS):
+                break
         
         return column_map
     
-    def _is_invoice_row(self, row: List) -> bool:
-        """Detecta si la fila contiene datos de factura"""
+    def _is_invoice_row(self, row: List, first_text: str) -> bool:
+        """Detecta si la fila contiene datos de factura (first_text: primera celda limpia)"""
         if not row or len(row) < 5:
             return False
         
-        first_cell = str(row[0]).strip().upper() if row[0] else ""
+        first_cell = first_text.upper()
         
         # Verificar si empieza con tipo de documento conocido
-        for doc_type in self.DOC_TYPES:
-            if first_cell.startswith(doc_type) or first_cell == doc_type:
-                return True
+        if first_cell.startswith(self._DOC_TYPES_TUPLE):
+            return True
         
         # Verificar si hay montos numéricos en posiciones típicas
         has_numbers = False
@@ -462,13 +804,17 @@ class LegacyExcelParser:
             invoice.installment = self._clean_number_string(inst_val)
             
             # Fecha de factura
-            invoice.invoice_date = self._parse_date(row[column_map.get('invoice_date', 5)] if len(row) > 5 else None)
+            invoice.invoice_date = self._parse_date(
+                row[column_map.get('invoice_date', 5)] if len(row) > 5 else None, excel_serial=True
+            )
             
             # Observaciones
             invoice.observations = str(row[column_map.get('observations', 6)]).strip() if len(row) > 6 else ""
             
             # Fecha de vencimiento
-            invoice.due_date = self._parse_date(row[column_map.get('due_date', 7)] if len(row) > 7 else None)
+            invoice.due_date = self._parse_date(
+                row[column_map.get('due_date', 7)] if len(row) > 7 else None, excel_serial=True
+            )
             
             # Monto original - buscar en posición 8 o donde haya número
             orig_amount = self._parse_amount(row[column_map.get('original', 8)] if len(row) > 8 else None)
@@ -514,13 +860,6 @@ class LegacyExcelParser:
         
         return invoice
     
-    def _matches_pattern(self, text: str, patterns: List[str]) -> bool:
-        """Verifica si el texto coincide con algún patrón"""
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
-    
     def _extract_value_after_colon(self, row: List) -> str:
         """Extrae el valor después de los dos puntos"""
         # Buscar en primera celda después del :
@@ -536,8 +875,13 @@ class LegacyExcelParser:
         
         return ""
     
-    def _parse_date(self, value: Any) -> Optional[date]:
-        """Parsea una fecha desde varios formatos"""
+    def _parse_date(self, value: Any, excel_serial: bool = False) -> Optional[date]:
+        """
+        Parsea una fecha desde varios formatos.
+        
+        Con excel_serial=True (columnas de fecha de las facturas) un número se
+        toma como serial de Excel y se resuelve con una suma, sin strptime.
+        """
         if value is None or value == "" or str(value).strip() == "":
             return None
         
@@ -549,23 +893,12 @@ class LegacyExcelParser:
         
         date_str = str(value).strip()
         
-        # Formatos comunes
-        formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-            '%d/%m/%Y',
-            '%d-%m-%Y',
-            '%d.%m.%Y',
-            '%Y/%m/%d',
-        ]
+        if excel_serial and date_str[0].isdigit():
+            serial_date = _excel_serial_date(date_str)
+            if serial_date:
+                return serial_date
         
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        
-        return None
+        return _parse_date_text(date_str)
     
     def _parse_amount(self, value: Any) -> Optional[float]:
         """Parsea un monto numérico"""
@@ -575,29 +908,7 @@ class LegacyExcelParser:
         if isinstance(value, (int, float)):
             return float(value)
         
-        value_str = str(value).strip()
-        if not value_str or value_str == '$':
-            return None
-        
-        # Limpiar caracteres de moneda y espacios
-        value_str = value_str.replace('$', '').replace(' ', '').replace('\xa0', '')
-        
-        # Manejar formato argentino (punto miles, coma decimal)
-        if ',' in value_str and '.' in value_str:
-            if value_str.rfind(',') > value_str.rfind('.'):
-                # Coma es decimal
-                value_str = value_str.replace('.', '').replace(',', '.')
-            else:
-                # Punto es decimal
-                value_str = value_str.replace(',', '')
-        elif ',' in value_str:
-            # Solo coma -> es decimal
-            value_str = value_str.replace(',', '.')
-        
-        try:
-            return float(value_str)
-        except ValueError:
-            return None
+        return _parse_amount_text(str(value).strip())
     
     def _clean_number_string(self, value: Any) -> str:
         """Limpia un valor numérico para usar como string"""
@@ -618,16 +929,19 @@ class LegacyExcelParser:
             self.result.errors.append("No se encontraron facturas válidas")
             return
         
-        # Verificar duplicados por hash (mismo documento, mismo monto)
-        seen_hashes = {}
+        # Verificar duplicados por hash (mismo documento, mismo monto).
+        # Se compara la entrada del hash: el md5 queda para la migración.
+        # Solo se guarda la fila de la última aparición: es lo único que usa el aviso
+        last_row_by_key: Dict[str, int] = {}
         for inv in self.result.invoices:
-            if inv.unique_hash in seen_hashes:
-                prev = seen_hashes[inv.unique_hash]
+            key = inv.hash_input
+            prev_row = last_row_by_key.get(key)
+            if prev_row is not None:
                 self.result.warnings.append(
-                    f"Duplicado exacto detectado: Fila {prev.row_number} y Fila {inv.row_number} - "
+                    f"Duplicado exacto detectado: Fila {prev_row} y Fila {inv.row_number} - "
                     f"{inv.customer_name} - {inv.document_reference} - ${inv.pending_amount:,.2f}"
                 )
-            seen_hashes[inv.unique_hash] = inv
+            last_row_by_key[key] = inv.row_number
         
         # Verificar clientes sin nombre
         unnamed = [inv for inv in self.result.invoices if not inv.customer_name]
@@ -642,36 +956,142 @@ class LegacyExcelParser:
 
 
 # =============================================================================
-# CLIENTE ODOO (XML-RPC)
+# CLIENTE ODOO (JSON-RPC)
 # =============================================================================
+# Misma implementación que en import_legacy_customers.py (cada script es un CLI
+# autónomo): las dos copias se mantienen idénticas, cambiar ambas a la vez.
+
+# Encoder compartido: sin espacios y con UTF-8 directo (sin escapes \uXXXX)
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+try:
+    # Opcional: orjson serializa y parsea bastante más rápido (pip install orjson)
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serializa a JSON compacto en UTF-8 (con orjson si está instalado)"""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return _JSON_ENCODER.encode(obj).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parsea una respuesta JSON (con orjson si está instalado)"""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
 
 class OdooClient:
-    """Cliente XML-RPC para Odoo"""
+    """
+    Cliente JSON-RPC para Odoo.
+    
+    Usa el endpoint /jsonrpc sobre una única conexión HTTP persistente
+    (keep-alive): no hay handshake TCP/TLS por llamada y el JSON se
+    serializa bastante más rápido que el XML de XML-RPC. Las respuestas
+    pueden llegar comprimidas con gzip; los requests van sin comprimir
+    porque Odoo no descomprime el cuerpo de las llamadas.
+    No es thread-safe: usar una instancia por hilo.
+    """
     
     def __init__(self, url: str, db: str, user: str, password: str):
-        import xmlrpc.client
-        
         self.url = url.rstrip("/")
         self.db = db
         self.user = user
         self.password = password
         
+        parts = urllib.parse.urlsplit(self.url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._endpoint = f"{parts.path}/jsonrpc"
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._request_id = 0
+        
         logger.info(f"Conectando a Odoo: {self.url}")
         
-        common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-        self.uid = common.authenticate(self.db, self.user, self.password, {})
+        self.uid = self._call("common", "authenticate", [self.db, self.user, self.password, {}])
         
         if not self.uid:
             raise RuntimeError(f"Error de autenticación en Odoo. Usuario: {self.user}")
         
-        self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
         logger.info(f"Conectado exitosamente. UID: {self.uid}")
     
+    def _call(self, service: str, method: str, args: List) -> Any:
+        """Ejecuta una llamada JSON-RPC y retorna el resultado"""
+        self._request_id += 1
+        payload = _json_dumps({
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": args},
+            "id": self._request_id,
+        })
+        
+        response = _json_loads(self._post(payload))
+        
+        error = response.get("error")
+        if error:
+            data = error.get("data") or {}
+            raise RuntimeError(data.get("message") or error.get("message") or str(error))
+        return response.get("result")
+    
+    def _post(self, payload: bytes) -> bytes:
+        """
+        Envía el POST reutilizando la conexión abierta.
+        
+        Ante cualquier error (timeout, SSL, lectura incompleta, gzip inválido)
+        la conexión se descarta: una a medio usar haría fallar todas las
+        llamadas siguientes de este cliente, que vuelve al pool.
+        
+        Solo se reintenta, una vez, sobre una conexión reutilizada que el
+        servidor ya había cerrado: si falla el envío, o si responde cerrando
+        sin mandar nada (RemoteDisconnected). En este segundo caso el request
+        ya se escribió; Odoo cierra las conexiones keep-alive ociosas sin
+        leerlo, pero si el servidor se cayó procesándolo un create podría
+        quedar repetido.
+        """
+        while True:
+            reused = self._conn is not None
+            if not reused:
+                conn_cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+                self._conn = conn_cls(self._host, self._port)
+            
+            conn = self._conn
+            sent = False
+            try:
+                conn.request(
+                    "POST", self._endpoint, body=payload,
+                    headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+                )
+                sent = True
+                response = conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status} desde {self.url}{self._endpoint}")
+                if response.getheader("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+            except BaseException as e:
+                conn.close()
+                self._conn = None
+                if sent:
+                    stale = isinstance(e, http.client.RemoteDisconnected)
+                else:
+                    # RemoteDisconnected es un ConnectionResetError
+                    stale = isinstance(e, (ConnectionResetError, BrokenPipeError))
+                if reused and stale:
+                    continue
+                raise
+    
     def execute_kw(self, model: str, method: str, args: List, kwargs: Optional[Dict] = None):
         """Ejecuta método en Odoo"""
         kwargs = kwargs or {}
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, args, kwargs
+        return self._call(
+            "object", "execute_kw",
+            [self.db, self.uid, self.password, model, method, args, kwargs]
         )
     
     def search(self, model: str, domain: List, limit: int = 0) -> List[int]:
@@ -694,6 +1114,10 @@ class OdooClient:
         """Crea un registro"""
         return self.execute_kw(model, "create", [vals])
     
+    def create_batch(self, model: str, vals_list: List[Dict]) -> List[int]:
+        """Crea varios registros en un único round-trip (create acepta una lista)"""
+        return self.execute_kw(model, "create", [vals_list])
+    
     def write(self, model: str, ids: List[int], vals: Dict) -> bool:
         """Actualiza registros"""
         return self.execute_kw(model, "write", [ids, vals])
@@ -720,7 +1144,10 @@ class LegacyBalanceMigrator:
         migration_date: Optional[date] = None,
         company_id: Optional[int] = None,
         dry_run: bool = True,
-        auto_post: bool = False
+        auto_post: bool = False,
+        batch_size: int = BATCH_SIZE,
+        num_threads: int = NUM_THREADS,
+        verbose: bool = False
     ):
         self.client = client
         self.receivable_account_code = receivable_account_code
@@ -729,35 +1156,74 @@ class LegacyBalanceMigrator:
         self.migration_date = migration_date or date.today()
         self.dry_run = dry_run
         self.auto_post = auto_post
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        # Detalle por factura/partner en el logger y en log_entries (si no,
+        # solo un avance por lote)
+        self.verbose = verbose
         
         # Cache
         self._company_id = company_id
         self._journal_id: Optional[int] = None
         self._receivable_account_id: Optional[int] = None
         self._counterpart_account_id: Optional[int] = None
-        self._partner_cache: Dict[str, int] = {}
+        self._partner_cache: Dict[Tuple[str, str], int] = {}
+        self._partner_by_name: Dict[str, int] = {}
+        self._partner_by_ref: Dict[str, int] = {}
+        # Resultado del ilike por nombre, también los sin coincidencia (None):
+        # cada nombre se busca una sola vez por migración
+        self._partner_by_like: Dict[str, Optional[int]] = {}
         self._existing_moves: Dict[str, int] = {}
+        # Conexiones de los hilos de _parallel_map, por número de hilo
+        self._worker_clients: Dict[int, OdooClient] = {}
+        
+        # Lotes de asientos pendientes para los hilos escritores (None en dry-run)
+        self._move_queue: Optional["queue.Queue[Optional[List[Tuple[LegacyInvoice, Dict[str, Any]]]]]"] = None
+        self._move_writers: List[threading.Thread] = []
+        # Los hilos escritores comparten los contadores de asientos
+        self._result_lock = threading.Lock()
+        # Facturas a migrar (para el avance)
+        self._moves_total = 0
         
         self.result = MigrationResult(dry_run=dry_run)
     
     def migrate(self, invoices: List[LegacyInvoice]) -> MigrationResult:
-        """Ejecuta la migración de las facturas legacy"""
+        """
+        Ejecuta la migración de las facturas legacy.
+        
+        Acepta la lista completa del parser: las inválidas se descartan (y se
+        registran) una sola vez al inicio, así que el loop no las revisa.
+        """
         logger.info(f"{'[DRY-RUN] ' if self.dry_run else ''}Iniciando migración de {len(invoices)} facturas")
         
         try:
             # Inicializar
             self._init_company()
-            self._init_journal()
-            self._init_accounts()
-            self._load_existing_moves()
+            self._init_lookups()
+            invoices = self._skip_invalid(invoices)
+            self._load_existing_moves(invoices)
+            invoices = self._skip_existing(invoices)
+            self._moves_total = len(invoices)
+            self._prefetch_partners(invoices)
+            self._resolve_partners(invoices)
             
-            # Procesar cada factura
-            for invoice in invoices:
-                if not invoice.is_valid:
-                    self._log(f"SKIP (inválida): Fila {invoice.row_number} - {invoice.validation_errors}")
-                    continue
+            # Procesar cada factura; los asientos se crean por lotes en hilos
+            # aparte mientras este sigue resolviendo partners y armando asientos
+            self._start_move_writer()
+            try:
+                pending: List[Tuple[LegacyInvoice, Dict[str, Any]]] = []
+                for invoice in invoices:
+                    move_vals = self._process_invoice(invoice)
+                    if move_vals:
+                        pending.append((invoice, move_vals))
+                        if len(pending) >= self.batch_size:
+                            self._submit_moves(pending)
+                            pending = []
                 
-                self._process_invoice(invoice)
+                if pending:
+                    self._submit_moves(pending)
+            finally:
+                self._stop_move_writer()
             
             # Resumen
             self._log_summary()
@@ -782,20 +1248,34 @@ class LegacyBalanceMigrator:
         else:
             raise RuntimeError("No se encontró ninguna compañía en Odoo")
     
-    def _init_journal(self):
+    def _init_lookups(self):
+        """
+        Resuelve diario y cuentas contables en paralelo.
+        
+        Son búsquedas independientes entre sí (solo el diario depende de la
+        compañía, ya resuelta): cada una va por su hilo y conexión, así el
+        arranque cuesta un round-trip en vez de tres o más seguidos.
+        """
+        self._parallel_map(
+            lambda init, client: init(client),
+            [self._init_journal, self._init_receivable_account, self._init_counterpart_account],
+        )
+    
+    def _init_journal(self, client: OdooClient):
         """Obtiene el diario para los asientos"""
-        journals = self.client.search_read(
+        journals = client.search_read(
             "account.journal",
             [("code", "=", self.journal_code), ("company_id", "=", self._company_id)],
-            ["id", "name", "type"]
+            ["id", "name"],
+            limit=1
         )
         
         if not journals:
             # Buscar cualquier diario general
-            journals = self.client.search_read(
+            journals = client.search_read(
                 "account.journal",
                 [("type", "=", "general"), ("company_id", "=", self._company_id)],
-                ["id", "name", "code"],
+                ["id", "name"],
                 limit=1
             )
         
@@ -805,18 +1285,19 @@ class LegacyBalanceMigrator:
         else:
             raise RuntimeError(f"No se encontró diario con código '{self.journal_code}' ni diario general")
     
-    def _init_accounts(self):
-        """Obtiene las cuentas contables"""
-        # Cuenta a cobrar - En Odoo 18 account.account no tiene company_id directo
-        accounts = self.client.search_read(
+    def _init_receivable_account(self, client: OdooClient):
+        """Obtiene la cuenta a cobrar"""
+        # En Odoo 18 account.account no tiene company_id directo
+        accounts = client.search_read(
             "account.account",
             [("code", "=", self.receivable_account_code)],
-            ["id", "name", "code"]
+            ["id", "name", "code"],
+            limit=1
         )
         
         if not accounts:
             # Buscar cuenta receivable por defecto
-            accounts = self.client.search_read(
+            accounts = client.search_read(
                 "account.account",
                 [("account_type", "=", "asset_receivable")],
                 ["id", "name", "code"],
@@ -828,17 +1309,19 @@ class LegacyBalanceMigrator:
             logger.info(f"Cuenta a cobrar: {accounts[0]['code']} - {accounts[0]['name']}")
         else:
             raise RuntimeError(f"No se encontró cuenta a cobrar (código: {self.receivable_account_code})")
-        
-        # Cuenta de contrapartida
-        accounts = self.client.search_read(
+    
+    def _init_counterpart_account(self, client: OdooClient):
+        """Obtiene la cuenta de contrapartida"""
+        accounts = client.search_read(
             "account.account",
             [("code", "=", self.counterpart_account_code)],
-            ["id", "name", "code"]
+            ["id", "name", "code"],
+            limit=1
         )
         
         if not accounts:
             # Buscar cuenta de equity/ajuste
-            accounts = self.client.search_read(
+            accounts = client.search_read(
                 "account.account",
                 [("account_type", "in", ["equity", "equity_unaffected"])],
                 ["id", "name", "code"],
@@ -851,108 +1334,354 @@ class LegacyBalanceMigrator:
         else:
             raise RuntimeError(f"No se encontró cuenta de contrapartida (código: {self.counterpart_account_code})")
     
-    def _load_existing_moves(self):
-        """Carga asientos existentes para idempotencia"""
-        moves = self.client.search_read(
-            "account.move",
-            [("ref", "like", f"{MOVE_REF_PREFIX}/"), ("company_id", "=", self._company_id)],
-            ["id", "ref"]
-        )
+    def _load_existing_moves(self, invoices: List[LegacyInvoice]):
+        """
+        Carga, para idempotencia, los asientos ya migrados de estas facturas.
+        
+        En vez de traer todo asiento con "MIGLEG/" (crece con cada corrida) se
+        buscan solo los hashes del archivo actual, por prefijo "MIGLEG/<hash>",
+        de a EXISTING_MOVES_CHUNK hashes por consulta y en paralelo. La clave de
+        idempotencia es el hash: el resto de la ref (sucursal, documento) puede
+        diferir sin que el asiento se vuelva a crear.
+        """
+        hashes = sorted({invoice.unique_hash for invoice in invoices})
+        chunks = [
+            hashes[i:i + EXISTING_MOVES_CHUNK]
+            for i in range(0, len(hashes), EXISTING_MOVES_CHUNK)
+        ]
         
-        for move in moves:
-            ref = move.get("ref", "")
-            # Extraer hash de la referencia
-            if f"{MOVE_REF_PREFIX}/" in ref:
-                hash_part = ref.split(f"{MOVE_REF_PREFIX}/")[1].split()[0].split("|")[0].strip()
-                self._existing_moves[hash_part] = move["id"]
+        for moves in self._parallel_map(self._search_existing_moves, chunks):
+            for move in moves:
+                # "MIGLEG/<hash> | Suc: ... | ...": la clave es solo el hash
+                unique_hash = (move.get("ref") or "").partition(" | ")[0].rpartition("/")[2]
+                self._existing_moves[unique_hash] = move["id"]
         
         logger.info(f"Asientos de migración existentes: {len(self._existing_moves)}")
     
+    def _search_existing_moves(self, hashes: List[str], client: OdooClient) -> List[Dict]:
+        """Asientos de la compañía cuya ref empieza con "MIGLEG/<hash>" para alguno de los hashes"""
+        domain: List[Any] = ["|"] * (len(hashes) - 1)
+        domain.extend(("ref", "=like", f"{MOVE_REF_PREFIX}/{unique_hash}%") for unique_hash in hashes)
+        domain.append(("company_id", "=", self._company_id))
+        return client.search_read("account.move", domain, ["id", "ref"])
+    
+    def _skip_invalid(self, invoices: List[LegacyInvoice]) -> List[LegacyInvoice]:
+        """
+        Descarta las facturas inválidas en una sola pasada al inicio: los pasos
+        siguientes (asientos existentes, partners, armado) ya no las revisan.
+        """
+        valid = []
+        for invoice in invoices:
+            if invoice.is_valid:
+                valid.append(invoice)
+            else:
+                self._log_row("SKIP (inválida): Fila {} - {}", invoice.row_number, invoice.validation_errors)
+        return valid
+    
+    def _skip_existing(self, invoices: List[LegacyInvoice]) -> List[LegacyInvoice]:
+        """
+        Descarta de entrada las facturas que ya tienen asiento migrado.
+        
+        Se filtra una sola vez antes del loop (y de buscar partners) y se
+        registra un único resumen; el detalle por factura queda en debug.
+        """
+        if not self._existing_moves:
+            return invoices
+        
+        pending = []
+        for invoice in invoices:
+            if invoice.unique_hash in self._existing_moves:
+                logger.debug("SKIP (existe): %s - %s", invoice.customer_name, invoice.document_reference)
+            else:
+                pending.append(invoice)
+        
+        skipped = len(invoices) - len(pending)
+        if skipped:
+            self.result.moves_skipped += skipped
+            self._log(f"SKIP (existen): {skipped} facturas ya migradas")
+        return pending
+    
+    def _prefetch_partners(self, invoices: List[LegacyInvoice]):
+        """
+        Trae en un solo search_read los partners que coinciden por nombre exacto
+        o por código con los clientes a migrar.
+        
+        Los resultados vienen en el orden por defecto de res.partner, así que
+        quedarse con el primero por clave equivale al search(limit=1) por
+        partner que se hacía antes.
+        """
+        names = set()
+        codes = set()
+        for invoice in invoices:
+            if invoice.customer_name:
+                names.add(invoice.customer_name)
+            if invoice.customer_code:
+                codes.add(invoice.customer_code)
+        
+        if not names and not codes:
+            return
+        
+        domain = []
+        if names and codes:
+            domain.append("|")
+        if names:
+            domain.append(("name", "in", sorted(names)))
+        if codes:
+            domain.append(("ref", "in", sorted(codes)))
+        
+        for partner in self.client.search_read("res.partner", domain, ["id", "name", "ref"]):
+            if partner.get("name") in names:
+                self._partner_by_name.setdefault(partner["name"], partner["id"])
+            if partner.get("ref") in codes:
+                self._partner_by_ref.setdefault(partner["ref"], partner["id"])
+        
+        logger.info(
+            f"Partners precargados: {len(self._partner_by_name)} por nombre, "
+            f"{len(self._partner_by_ref)} por código"
+        )
+    
+    def _resolve_partners(self, invoices: List[LegacyInvoice]):
+        """
+        Resuelve antes del loop el partner de cada cliente a migrar.
+        
+        Las búsquedas por nombre parcial y los create de partners eran las
+        llamadas más lentas y se hacían de a una. Ahora las ilike se reparten
+        entre num_threads hilos (cada uno con su conexión, así se usan varios
+        workers de Odoo) y los partners nuevos se crean por lotes, también en
+        paralelo. La asignación sigue el orden de _get_or_create_partner
+        (nombre exacto, nombre parcial, código); la búsqueda ilike solo ve
+        partners que existían antes de la migración.
+        Lo que no se pueda resolver acá (un create fallido) vuelve al camino
+        de a una factura.
+        """
+        keys: Dict[Tuple[str, str], LegacyInvoice] = {}
+        for invoice in invoices:
+            key = (invoice.customer_name, invoice.customer_code)
+            if key not in self._partner_cache:
+                keys.setdefault(key, invoice)
+        
+        if not keys:
+            return
+        
+        # 1. Nombre parcial, solo para los nombres sin coincidencia exacta
+        names = sorted({
+            name for name, _ in keys
+            if name and name not in self._partner_by_name and name not in self._partner_by_like
+        })
+        self._partner_by_like.update(zip(names, self._parallel_map(self._search_partner_like, names)))
+        
+        # 2. Asignación en orden de aparición; los partners a crear se
+        #    identifican por su posición en to_create
+        to_create: List[Tuple[LegacyInvoice, Dict[str, Any]]] = []
+        new_by_name: Dict[str, int] = {}
+        new_by_ref: Dict[str, int] = {}
+        links: List[Tuple[Tuple[str, str], int]] = []
+        for key, invoice in keys.items():
+            name, code = key
+            partner_id = None
+            new_index = None
+            if name:
+                partner_id = self._partner_by_name.get(name)
+                if not partner_id:
+                    new_index = new_by_name.get(name)
+                if not partner_id and new_index is None:
+                    partner_id = self._partner_by_like.get(name)
+            if not partner_id and new_index is None and code:
+                partner_id = self._partner_by_ref.get(code)
+                if not partner_id:
+                    new_index = new_by_ref.get(code)
+            
+            if partner_id:
+                self.result.partners_found += 1
+                self._partner_cache[key] = partner_id
+            elif new_index is not None:
+                links.append((key, new_index))
+            else:
+                vals = self._new_partner_vals(invoice)
+                new_index = len(to_create)
+                to_create.append((invoice, vals))
+                new_by_name.setdefault(vals["name"], new_index)
+                if code:
+                    new_by_ref.setdefault(code, new_index)
+                links.append((key, new_index))
+        
+        if not to_create:
+            return
+        
+        # 3. Crear los partners nuevos por lotes, repartidos entre los hilos
+        if self.dry_run:
+            for invoice, _ in to_create:
+                self._log_row("[DRY-RUN] Crearía partner: {}", invoice.customer_name or invoice.customer_code)
+            created_ids: List[Optional[int]] = [-1] * len(to_create)
+        else:
+            chunks = [
+                to_create[i:i + self.batch_size]
+                for i in range(0, len(to_create), self.batch_size)
+            ]
+            created_ids = []
+            for ids in self._parallel_map(self._create_partners, chunks):
+                created_ids.extend(ids)
+        
+        for (invoice, vals), partner_id in zip(to_create, created_ids):
+            if not partner_id:
+                continue
+            self.result.partners_created += 1
+            if not self.dry_run:
+                self._log_row("Partner creado: {} (ID: {})", vals["name"], partner_id)
+                self._partner_by_name.setdefault(vals["name"], partner_id)
+                if invoice.customer_code:
+                    self._partner_by_ref.setdefault(invoice.customer_code, partner_id)
+        
+        created_keys = {(inv.customer_name, inv.customer_code) for inv, _ in to_create}
+        for key, new_index in links:
+            partner_id = created_ids[new_index]
+            if not partner_id:
+                continue
+            if key not in created_keys:
+                self.result.partners_found += 1
+            self._partner_cache[key] = partner_id
+    
+    def _parallel_map(self, func: Callable[[Any, OdooClient], Any], items: List) -> List:
+        """
+        Aplica func(item, client) a cada item repartiendo entre num_threads hilos.
+        
+        Cada hilo procesa los items i, i + n, i + 2n... con su propio cliente
+        (OdooClient no es thread-safe); el primero reutiliza self.client, libre
+        mientras este hilo espera. Retorna los resultados en el orden de items.
+        """
+        workers = min(self.num_threads, len(items))
+        if workers <= 1:
+            return [func(item, self.client) for item in items]
+        
+        results: List[Any] = [None] * len(items)
+        
+        def run_shard(shard: int):
+            client = self._worker_client(shard)
+            for i in range(shard, len(items), workers):
+                results[i] = func(items[i], client)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(run_shard, shard) for shard in range(workers)]:
+                future.result()
+        return results
+    
+    def _worker_client(self, shard: int) -> OdooClient:
+        """
+        Cliente del hilo número shard; los de shard > 0 se crean la primera
+        vez y se reutilizan en las siguientes llamadas a _parallel_map (cada
+        uno autentica contra Odoo al crearse).
+        """
+        if shard == 0:
+            return self.client
+        client = self._worker_clients.get(shard)
+        if client is None:
+            client = OdooClient(self.client.url, self.client.db, self.client.user, self.client.password)
+            self._worker_clients[shard] = client
+        return client
+    
+    @staticmethod
+    def _search_partner_like(name: str, client: OdooClient) -> Optional[int]:
+        """Busca un partner por nombre parcial"""
+        partners = client.search("res.partner", [("name", "ilike", name)], limit=1)
+        return partners[0] if partners else None
+    
+    def _create_partners(self, chunk: List[Tuple[LegacyInvoice, Dict[str, Any]]],
+                         client: OdooClient) -> List[Optional[int]]:
+        """Crea un lote de partners; si el create masivo falla, reintenta de a uno"""
+        try:
+            return client.create_batch("res.partner", [vals for _, vals in chunk])
+        except Exception as e:
+            logger.warning(f"Create masivo de {len(chunk)} partners falló, reintentando de a uno: {e}")
+        
+        ids: List[Optional[int]] = []
+        for _, vals in chunk:
+            try:
+                ids.append(client.create("res.partner", vals))
+            except Exception as e:
+                logger.warning(f"No se pudo crear el partner {vals['name']}: {e}")
+                ids.append(None)
+        return ids
+    
+    @staticmethod
+    def _new_partner_vals(invoice: LegacyInvoice) -> Dict[str, Any]:
+        """Valores de un partner nuevo para el cliente de la factura"""
+        vals = {
+            "name": invoice.customer_name or f"Cliente {invoice.customer_code}",
+            "customer_rank": 1,
+            "company_id": False,  # Partner compartido
+        }
+        if invoice.customer_code:
+            vals["ref"] = invoice.customer_code
+        if invoice.customer_contact:
+            # Intentar extraer teléfono
+            vals["comment"] = f"Migrado del sistema legacy. Contacto: {invoice.customer_contact}"
+        return vals
+    
     def _get_or_create_partner(self, invoice: LegacyInvoice) -> Optional[int]:
         """Obtiene o crea el partner"""
-        # Clave de cache: nombre + código
-        cache_key = f"{invoice.customer_name}|{invoice.customer_code}"
+        # Clave de cache: (nombre, código), sin armar un string por factura
+        cache_key = (invoice.customer_name, invoice.customer_code)
         
-        if cache_key in self._partner_cache:
-            return self._partner_cache[cache_key]
+        partner_id = self._partner_cache.get(cache_key)
+        if partner_id is not None:
+            return partner_id
         
         partner_id = None
         
-        # Buscar por nombre exacto
+        # Buscar por nombre exacto (precargado)
         if invoice.customer_name:
-            partners = self.client.search(
-                "res.partner",
-                [("name", "=", invoice.customer_name)],
-                limit=1
-            )
-            if partners:
-                partner_id = partners[0]
+            partner_id = self._partner_by_name.get(invoice.customer_name)
         
-        # Buscar por nombre parcial
+        # Buscar por nombre parcial (una vez por nombre, aunque no haya coincidencia)
         if not partner_id and invoice.customer_name:
-            partners = self.client.search(
-                "res.partner",
-                [("name", "ilike", invoice.customer_name)],
-                limit=1
-            )
-            if partners:
-                partner_id = partners[0]
+            if invoice.customer_name in self._partner_by_like:
+                partner_id = self._partner_by_like[invoice.customer_name]
+            else:
+                partner_id = self._search_partner_like(invoice.customer_name, self.client)
+                self._partner_by_like[invoice.customer_name] = partner_id
         
-        # Buscar por referencia/código
+        # Buscar por referencia/código (precargado)
         if not partner_id and invoice.customer_code:
-            partners = self.client.search(
-                "res.partner",
-                [("ref", "=", invoice.customer_code)],
-                limit=1
-            )
-            if partners:
-                partner_id = partners[0]
+            partner_id = self._partner_by_ref.get(invoice.customer_code)
         
         # Crear si no existe
         if not partner_id:
             if self.dry_run:
-                self._log(f"[DRY-RUN] Crearía partner: {invoice.customer_name or invoice.customer_code}")
+                self._log_row("[DRY-RUN] Crearía partner: {}", invoice.customer_name or invoice.customer_code)
                 self.result.partners_created += 1
                 # Retornar ID ficticio para dry-run
                 partner_id = -1
             else:
-                vals = {
-                    "name": invoice.customer_name or f"Cliente {invoice.customer_code}",
-                    "customer_rank": 1,
-                    "company_id": False,  # Partner compartido
-                }
-                if invoice.customer_code:
-                    vals["ref"] = invoice.customer_code
-                if invoice.customer_contact:
-                    # Intentar extraer teléfono
-                    vals["comment"] = f"Migrado del sistema legacy. Contacto: {invoice.customer_contact}"
-                
+                vals = self._new_partner_vals(invoice)
                 partner_id = self.client.create("res.partner", vals)
-                self._log(f"Partner creado: {vals['name']} (ID: {partner_id})")
+                self._log_row("Partner creado: {} (ID: {})", vals["name"], partner_id)
                 self.result.partners_created += 1
+                # Visible para los siguientes clientes con igual nombre/código
+                self._partner_by_name.setdefault(vals["name"], partner_id)
+                if invoice.customer_code:
+                    self._partner_by_ref.setdefault(invoice.customer_code, partner_id)
         else:
             self.result.partners_found += 1
         
         self._partner_cache[cache_key] = partner_id
         return partner_id
     
-    def _process_invoice(self, invoice: LegacyInvoice):
-        """Procesa una factura y crea el asiento"""
-        
-        # Verificar idempotencia
-        if invoice.unique_hash in self._existing_moves:
-            self._log(f"SKIP (existe): {invoice.customer_name} - {invoice.document_reference}")
-            self.result.moves_skipped += 1
-            return
+    def _process_invoice(self, invoice: LegacyInvoice) -> Optional[Dict[str, Any]]:
+        """Prepara el asiento de una factura nueva; None si falla el partner"""
+        # Las que ya existen en Odoo se descartaron en _skip_existing
         
         # Obtener partner
         partner_id = self._get_or_create_partner(invoice)
         if not partner_id:
-            self.result.errors.append(
+            self._add_error(
                 f"Fila {invoice.row_number}: No se pudo obtener/crear partner para {invoice.customer_name}"
             )
-            return
+            return None
         
+        return self._build_move_vals(invoice, partner_id)
+    
+    def _build_move_vals(self, invoice: LegacyInvoice, partner_id: int) -> Dict[str, Any]:
+        """Arma los valores del asiento (cuenta a cobrar al Debe, contrapartida al Haber)"""
         # Preparar asiento
         move_date = invoice.invoice_date or self.migration_date
         
@@ -967,7 +1696,7 @@ class LegacyBalanceMigrator:
         
         # Agregar fecha de vencimiento si existe
         if invoice.due_date:
-            line_receivable["date_maturity"] = invoice.due_date.isoformat()
+            line_receivable["date_maturity"] = _date_iso(invoice.due_date)
         
         # Línea de contrapartida (Haber)
         line_counterpart = {
@@ -980,7 +1709,7 @@ class LegacyBalanceMigrator:
         
         move_vals = {
             "journal_id": self._journal_id,
-            "date": move_date.isoformat(),
+            "date": _date_iso(move_date),
             "ref": invoice.full_reference,
             "company_id": self._company_id,
             "move_type": "entry",
@@ -990,61 +1719,172 @@ class LegacyBalanceMigrator:
             ],
         }
         
-        # Agregar narración con detalles
-        narration_parts = [
-            "=== MIGRACIÓN SISTEMA LEGACY ===",
-            f"Cliente: {invoice.customer_name}",
-            f"Código: {invoice.customer_code}",
-            f"Sucursal legacy: {invoice.branch_name}",
-            f"Documento: {invoice.document_reference}",
-            f"Monto original: ${invoice.original_amount:,.2f}",
-            f"Monto pendiente: ${invoice.pending_amount:,.2f}",
-        ]
+        # Agregar narración con detalles: las líneas fijas en un solo f-string
+        # (sin armar una lista y unirla por cada factura)
+        narration = (
+            "=== MIGRACIÓN SISTEMA LEGACY ===\n"
+            f"Cliente: {invoice.customer_name}\n"
+            f"Código: {invoice.customer_code}\n"
+            f"Sucursal legacy: {invoice.branch_name}\n"
+            f"Documento: {invoice.document_reference}\n"
+            f"Monto original: ${invoice.original_amount:,.2f}\n"
+            f"Monto pendiente: ${invoice.pending_amount:,.2f}"
+        )
         if invoice.due_date:
-            narration_parts.append(f"Vencimiento: {invoice.due_date}")
+            narration += f"\nVencimiento: {invoice.due_date}"
         if invoice.days_overdue:
-            narration_parts.append(f"Días de mora: {invoice.days_overdue}")
+            narration += f"\nDías de mora: {invoice.days_overdue}"
         if invoice.observations:
-            narration_parts.append(f"Observaciones: {invoice.observations}")
+            narration += f"\nObservaciones: {invoice.observations}"
         
-        move_vals["narration"] = "\n".join(narration_parts)
+        move_vals["narration"] = narration
         
+        return move_vals
+    
+    def _start_move_writer(self):
+        """Arranca los hilos (num_threads) que crean los asientos (solo en ejecución real)"""
         if self.dry_run:
-            self._log(
-                f"[DRY-RUN] Crearía asiento: {invoice.customer_name} - "
-                f"{invoice.document_reference} - ${invoice.pending_amount:,.2f}"
-            )
-            self.result.moves_created += 1
-            self.result.total_amount_migrated += invoice.pending_amount
+            return
+        self._move_queue = queue.Queue(maxsize=2 * self.num_threads)
+        self._move_writers = [
+            threading.Thread(target=self._write_moves, args=(self._move_queue,), daemon=True)
+            for _ in range(self.num_threads)
+        ]
+        for writer in self._move_writers:
+            writer.start()
+    
+    def _stop_move_writer(self):
+        """Espera a que los hilos escritores terminen los lotes encolados"""
+        if not self._move_writers:
+            return
+        for _ in self._move_writers:
+            self._move_queue.put(None)
+        for writer in self._move_writers:
+            writer.join()
+        self._move_queue = None
+        self._move_writers = []
+    
+    def _submit_moves(self, pending: List[Tuple[LegacyInvoice, Dict[str, Any]]]):
+        """Encola un lote para los hilos escritores (en dry-run se procesa acá mismo)"""
+        if self._move_queue is None:
+            self._create_moves(pending)
+            self._log_progress()
         else:
+            # Cola acotada: si Odoo va más lento, el armado de asientos espera
+            self._move_queue.put(pending)
+    
+    def _write_moves(self, batches: "queue.Queue[Optional[List[Tuple[LegacyInvoice, Dict[str, Any]]]]]"):
+        """
+        Hilo escritor: crea los lotes de asientos hasta recibir None.
+        
+        Usa su propia conexión (OdooClient no es thread-safe). Los contadores
+        de asientos y errors se comparten con el hilo principal y los demás
+        escritores: se actualizan bajo _result_lock.
+        """
+        client = None
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
             try:
-                move_id = self.client.create("account.move", move_vals)
-                self.result.created_move_ids.append(move_id)
-                self.result.moves_created += 1
-                self.result.total_amount_migrated += invoice.pending_amount
-                
-                self._log(
-                    f"Asiento creado (ID: {move_id}): {invoice.customer_name} - "
-                    f"{invoice.document_reference} - ${invoice.pending_amount:,.2f}"
-                )
-                
-                # Publicar si corresponde
-                if self.auto_post:
-                    try:
-                        self.client.execute_kw("account.move", "action_post", [[move_id]])
-                    except Exception as e:
-                        self.result.errors.append(f"Error publicando asiento {move_id}: {str(e)}")
-                
+                if client is None:
+                    client = OdooClient(self.client.url, self.client.db, self.client.user, self.client.password)
+                self._create_moves(batch, client)
+                self._log_progress()
             except Exception as e:
-                self.result.errors.append(
-                    f"Error creando asiento para {invoice.customer_name}: {str(e)}"
+                logger.error("Error creando lote de %s asientos: %s", len(batch), e)
+                self._add_error(f"Error creando lote de {len(batch)} asientos: {str(e)}")
+    
+    def _create_moves(self, pending: List[Tuple[LegacyInvoice, Dict[str, Any]]],
+                      client: Optional[OdooClient] = None):
+        """Crea un lote de asientos con un único create (lista de valores)"""
+        client = client or self.client
+        if self.dry_run:
+            for invoice, _ in pending:
+                self._log_row(
+                    "[DRY-RUN] Crearía asiento: {} - {} - ${:,.2f}",
+                    invoice.customer_name, invoice.document_reference, invoice.pending_amount
                 )
+                self.result.moves_created += 1
+                self.result.total_amount_migrated += invoice.pending_amount
+            return
+        
+        try:
+            move_ids = client.create_batch("account.move", [vals for _, vals in pending])
+        except Exception as e:
+            if len(pending) == 1:
+                invoice = pending[0][0]
+                self._add_error(f"Error creando asiento para {invoice.customer_name}: {str(e)}")
+                return
+            # Un asiento inválido hace fallar todo el create: aislarlo
+            logger.warning("Falló create de %s asientos, reintentando uno a uno: %s", len(pending), e)
+            for item in pending:
+                self._create_moves([item], client)
+            return
+        
+        for (invoice, _), move_id in zip(pending, move_ids):
+            self._register_move(invoice, move_id)
+        
+        # Publicar si corresponde
+        if self.auto_post:
+            self._post_moves(move_ids, client)
     
+    def _post_moves(self, move_ids: List[int], client: OdooClient):
+        """Publica un lote de asientos con un único action_post"""
+        try:
+            client.execute_kw("account.move", "action_post", [move_ids])
+            return
+        except Exception as e:
+            if len(move_ids) == 1:
+                self._add_error(f"Error publicando asiento {move_ids[0]}: {str(e)}")
+                return
+            # action_post corre en una transacción: si falla, no se publicó ninguno
+            logger.warning("Falló action_post de %s asientos, reintentando uno a uno: %s", len(move_ids), e)
+        for move_id in move_ids:
+            self._post_moves([move_id], client)
+    
+    def _register_move(self, invoice: LegacyInvoice, move_id: int):
+        """Registra un asiento creado"""
+        with self._result_lock:
+            self.result.created_move_ids.append(move_id)
+            self.result.moves_created += 1
+            self.result.total_amount_migrated += invoice.pending_amount
+        
+        self._log_row(
+            "Asiento creado (ID: {}): {} - {} - ${:,.2f}",
+            move_id, invoice.customer_name, invoice.document_reference, invoice.pending_amount
+        )
+
+    def _add_error(self, message: str):
+        """Registra un error en el resultado (lo llaman también los hilos escritores)"""
+        with self._result_lock:
+            self.result.errors.append(message)
+
     def _log(self, message: str):
         """Registra mensaje en log y resultado"""
         logger.info(message)
         self.result.log_entries.append(message)
     
+    def _log_row(self, message: str, *args):
+        """
+        Registra el detalle de una factura o partner, solo con verbose (en el
+        logger y en log_entries): sin verbose no se arma el texto de cada fila
+        ni se toma el lock de logging en los hilos escritores. El formato es
+        str.format, diferido como el %s de logging, para conservar {:,.2f}.
+        """
+        if not self.verbose:
+            return
+        message = message.format(*args)
+        logger.info(message)
+        self.result.log_entries.append(message)
+    
+    def _log_progress(self):
+        """Avance de la creación de asientos, una línea por lote"""
+        if not self.verbose:
+            with self._result_lock:
+                moves_created = self.result.moves_created
+            logger.info("Asientos creados: %s/%s", moves_created, self._moves_total)
+    
     def _log_summary(self):
         """Registra resumen de la migración"""
         summary = [
@@ -1128,12 +1968,33 @@ Variables de entorno:
         help="Ejecutar la migración real"
     )
     
+    parser.add_argument(
+        "--reader",
+        choices=["openpyxl", "calamine"],
+        default="openpyxl",
+        help="Lector de Excel: openpyxl o python-calamine, más rápido (default: openpyxl)"
+    )
+    
     parser.add_argument(
         "--auto-post",
         action="store_true",
         help="Publicar automáticamente los asientos creados"
     )
     
+    parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Asientos por llamada create (default: {BATCH_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--threads", "--workers", "-t",
+        type=int,
+        default=NUM_THREADS,
+        help=f"Hilos para buscar y crear partners y asientos en paralelo (default: {NUM_THREADS})"
+    )
+    
     parser.add_argument(
         "--receivable-account",
         default=DEFAULT_RECEIVABLE_ACCOUNT_CODE,
@@ -1204,7 +2065,7 @@ Variables de entorno:
     print("PASO 1: ANÁLISIS DEL ARCHIVO EXCEL")
     print("=" * 60 + "\n")
     
-    parser_obj = LegacyExcelParser(args.excel)
+    parser_obj = LegacyExcelParser(args.excel, reader=args.reader)
     parse_result = parser_obj.parse()
     
     # Mostrar resultados del parsing
@@ -1274,38 +2135,44 @@ Variables de entorno:
         journal_code=args.journal,
         migration_date=migration_date,
         dry_run=args.dry_run,
-        auto_post=args.auto_post
+        auto_post=args.auto_post,
+        batch_size=max(1, args.batch_size),
+        num_threads=max(1, args.threads),
+        verbose=args.verbose
     )
     
-    valid_invoices = [inv for inv in parse_result.invoices if inv.is_valid]
-    migration_result = migrator.migrate(valid_invoices)
-    
-    # Mostrar resultados
-    print("\n" + "=" * 60)
-    print(f"{'[DRY-RUN] ' if args.dry_run else ''}RESULTADO DE LA MIGRACIÓN")
-    print("=" * 60)
-    print(f"👥 Partners encontrados:     {migration_result.partners_found}")
-    print(f"👤 Partners creados:         {migration_result.partners_created}")
-    print(f"📝 Asientos creados:         {migration_result.moves_created}")
-    print(f"⏭️  Asientos omitidos (dup): {migration_result.moves_skipped}")
-    print(f"💰 Monto total migrado:      ${migration_result.total_amount_migrated:,.2f}")
+    # Lista completa: migrate() descarta y registra las inválidas
+    migration_result = migrator.migrate(parse_result.invoices)
+    
+    # Mostrar resultados: se arma el bloque completo y se escribe de una sola vez
+    lines = [
+        "",
+        "=" * 60,
+        f"{'[DRY-RUN] ' if args.dry_run else ''}RESULTADO DE LA MIGRACIÓN",
+        "=" * 60,
+        f"👥 Partners encontrados:     {migration_result.partners_found}",
+        f"👤 Partners creados:         {migration_result.partners_created}",
+        f"📝 Asientos creados:         {migration_result.moves_created}",
+        f"⏭️  Asientos omitidos (dup): {migration_result.moves_skipped}",
+        f"💰 Monto total migrado:      ${migration_result.total_amount_migrated:,.2f}",
+    ]
     
     if migration_result.errors:
-        print(f"\n❌ ERRORES ({len(migration_result.errors)}):")
-        for e in migration_result.errors[:10]:
-            print(f"   - {e}")
+        lines.append(f"\n❌ ERRORES ({len(migration_result.errors)}):")
+        lines.extend(f"   - {e}" for e in migration_result.errors[:10])
         if len(migration_result.errors) > 10:
-            print(f"   ... y {len(migration_result.errors) - 10} más")
+            lines.append(f"   ... y {len(migration_result.errors) - 10} más")
     
     if args.dry_run:
-        print("\n💡 Este fue un DRY-RUN. Para ejecutar realmente, use --execute")
+        lines.append("\n💡 Este fue un DRY-RUN. Para ejecutar realmente, use --execute")
     else:
-        print("\n✅ Migración completada exitosamente")
+        lines.append("\n✅ Migración completada exitosamente")
         if migration_result.created_move_ids:
-            print(f"   IDs de asientos creados: {migration_result.created_move_ids[:20]}")
+            lines.append(f"   IDs de asientos creados: {migration_result.created_move_ids[:20]}")
             if len(migration_result.created_move_ids) > 20:
-                print(f"   ... y {len(migration_result.created_move_ids) - 20} más")
-
+                lines.append(f"   ... y {len(migration_result.created_move_ids) - 20} más")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     main()